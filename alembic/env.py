@@ -27,6 +27,19 @@ if config.config_file_name is not None:
 # target_metadata = mymodel.Base.metadata
 target_metadata = metadata
 
+# objects created by hand in the migrations, the models don't declare
+# them, so autogenerate must not drop them
+EXCLUDED_OBJECTS = {
+    ("column", "search_vector"),
+    ("index", "ix_product_search_vector"),
+}
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    """Skip the objects that are not declared in the models."""
+    return (type_, name) not in EXCLUDED_OBJECTS
+
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -52,7 +65,8 @@ def run_migrations_offline():
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
         compare_type=True,
-        user_module_prefix="sa."
+        user_module_prefix="sa.",
+        include_object=include_object
     )
 
     with context.begin_transaction():
@@ -77,7 +91,8 @@ def run_migrations_online():
             connection=connection,
             target_metadata=target_metadata,
             compare_type=True,
-            user_module_prefix="sa."
+            user_module_prefix="sa.",
+            include_object=include_object
         )
 
         with context.begin_transaction():
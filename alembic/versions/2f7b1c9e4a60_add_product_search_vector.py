@@ -0,0 +1,38 @@
+"""add product search vector
+
+Revision ID: 2f7b1c9e4a60
+Revises: 9d3f5a7c2e18
+Create Date: 2022-05-29 11:20:37.514208
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '2f7b1c9e4a60'
+down_revision = '9d3f5a7c2e18'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # the column is generated by postgres, so it is always in sync with
+    # title and description, it is not declared on the ormar model
+    op.add_column('product', sa.Column(
+        'search_vector',
+        postgresql.TSVECTOR(),
+        sa.Computed(
+            "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(description, '')), 'B')",
+            persisted=True
+        ),
+        nullable=True
+    ))
+    op.create_index('ix_product_search_vector', 'product', ['search_vector'], unique=False, postgresql_using='gin')
+
+
+def downgrade():
+    op.drop_index('ix_product_search_vector', table_name='product')
+    op.drop_column('product', 'search_vector')
@@ -0,0 +1,128 @@
+"""move product image to blob store
+
+Revision ID: c1e4a7d2b9f0
+Revises: 93593486a310
+Create Date: 2022-05-21 14:32:08.417552
+
+"""
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c1e4a7d2b9f0'
+down_revision = '93593486a310'
+branch_labels = None
+depends_on = None
+
+
+# a copy of the local blob store layout as of this revision, so the
+# migration does not change with the app: files named by the SHA-256 of
+# the content, sharded by its first two bytes (ab/cd/abcd...)
+def blob_root():
+    """Get the blob store root, passed with `-x blob_root=/path`."""
+    root = context.get_x_argument(as_dictionary=True).get('blob_root')
+    if not root:
+        raise RuntimeError(
+            'Product images are moved to the blob store, '
+            'pass its root with `alembic -x blob_root=/path upgrade`')
+    return Path(root).resolve()
+
+
+def blob_path(root, key):
+    return root / key[:2] / key[2:4] / key
+
+
+def put_blob(root, data):
+    key = hashlib.sha256(data).hexdigest()
+    path = blob_path(root, key)
+    if not path.is_file():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    return key
+
+
+# the image types of the app as of this revision, from the magic bytes
+def sniff_image_type(data):
+    if data.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'image/png'
+    if data.startswith(b'\xff\xd8\xff'):
+        return 'image/jpeg'
+    if data.startswith((b'GIF87a', b'GIF89a')):
+        return 'image/gif'
+    if data.startswith(b'RIFF') and data[8:12] == b'WEBP':
+        return 'image/webp'
+    return None
+
+
+def upgrade():
+    op.add_column('product', sa.Column('image_id', sa.String(length=64), nullable=True))
+    op.add_column('product', sa.Column('image_type', sa.String(length=128), nullable=True))
+
+    # copy existing images into the blob store before dropping the column
+    conn = op.get_bind()
+    product = sa.table(
+        'product',
+        sa.column('id', sa.CHAR(36)),
+        sa.column('image', sa.LargeBinary()),
+        sa.column('image_id', sa.String()),
+        sa.column('image_type', sa.String()),
+    )
+    rows = conn.execute(
+        sa.select(product.c.id).where(product.c.image.isnot(None))
+    ).fetchall()
+    root = blob_root() if rows else None
+    for row in rows:
+        image = conn.execute(
+            sa.select(product.c.image).where(product.c.id == row.id)
+        ).scalar()
+        # unknown types stay null and are served as binary data
+        conn.execute(
+            product.update()
+            .where(product.c.id == row.id)
+            .values(
+                image_id=put_blob(root, image),
+                image_type=sniff_image_type(image),
+            )
+        )
+
+    op.drop_column('product', 'image')
+
+
+def downgrade():
+    op.add_column('product', sa.Column('image', sa.LargeBinary(length=20000000), nullable=True))
+
+    conn = op.get_bind()
+    product = sa.table(
+        'product',
+        sa.column('id', sa.CHAR(36)),
+        sa.column('image', sa.LargeBinary()),
+        sa.column('image_id', sa.String()),
+    )
+    rows = conn.execute(
+        sa.select(product.c.id, product.c.image_id)
+        .where(product.c.image_id.isnot(None))
+    ).fetchall()
+    root = blob_root() if rows else None
+    for row in rows:
+        image = blob_path(root, row.image_id).read_bytes()
+        conn.execute(
+            product.update()
+            .where(product.c.id == row.id)
+            .values(image=image)
+        )
+
+    op.drop_column('product', 'image_type')
+    op.drop_column('product', 'image_id')
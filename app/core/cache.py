@@ -0,0 +1,212 @@
+"""Caches."""
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Hashable
+
+from ..core import metrics
+from ..core.config import settings
+
+
+class TTLCache:
+    """
+    LRU cache whose entries expire after a time-to-live.
+
+    Not shared between worker processes, so keep the TTL short for
+    data that can be changed by another worker. Hits and misses are
+    counted in the metrics under `name`.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, *, name: str):
+        """Initialize."""
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def __len__(self) -> int:
+        """Get the number of entries (including expired ones)."""
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get the value by key."""
+        item = self._data.get(key)
+        if item is not None:
+            expires_at, value = item
+            if expires_at > time.monotonic():
+                self._data.move_to_end(key)
+                self.hits += 1
+                metrics.CACHE_HITS.inc(self.name)
+                return value
+            del self._data[key]
+        self.misses += 1
+        metrics.CACHE_MISSES.inc(self.name)
+        return default
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        """Set the value by key, evict the least recently used if full."""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        """Delete the value by key."""
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Delete all values."""
+        self._data.clear()
+
+    def stats(self) -> dict[str, int]:
+        """Get the hit/miss counters."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+        }
+
+
+class CacheBackend(ABC):
+    """Key-value store for cached responses."""
+
+    @abstractmethod
+    async def get(self, key: str) -> bytes | None:
+        """Get the value by key."""
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        """Set the value by key, expire it after `ttl` seconds."""
+
+    async def close(self) -> None:
+        """Release the resources of the backend."""
+
+
+class MemoryCacheBackend(CacheBackend):
+    """LRU cache in the worker process."""
+
+    def __init__(self, maxsize: int):
+        """Initialize."""
+        self.cache = TTLCache(
+            maxsize=maxsize, ttl=settings.RESPONSE_CACHE_TTL, name="response")
+
+    async def get(self, key: str) -> bytes | None:
+        """Get the value by key."""
+        return self.cache.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        """Set the value by key, expire it after `ttl` seconds."""
+        self.cache.set(key, value, ttl=ttl)
+
+
+class RedisCacheBackend(CacheBackend):
+    """Redis cache shared by all workers."""
+
+    def __init__(self, url: str):
+        """Initialize."""
+        try:
+            from redis import asyncio as aioredis
+        except ImportError:
+            raise RuntimeError("The redis cache backend requires `redis`")
+        self.redis = aioredis.from_url(url)
+
+    async def get(self, key: str) -> bytes | None:
+        """Get the value by key."""
+        return await self.redis.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        """Set the value by key, expire it after `ttl` seconds."""
+        await self.redis.set(key, value, ex=ttl)
+
+    async def close(self) -> None:
+        """Release the resources of the backend."""
+        await self.redis.close()
+
+
+class ResponseCache:
+    """
+    Cache of serialized responses, invalidated per brand.
+
+    Keys embed a generation of the brand. Invalidating a brand sets a
+    new generation (a timestamp), so every cached response of the brand
+    becomes unreachable at once, in any backend. A response is stored
+    under the generation seen before its data was read, so one built
+    from data read before a write can't be stored under the new one.
+    """
+
+    def __init__(self, backend: CacheBackend | None, ttl: int):
+        """Initialize."""
+        self.backend = backend
+        self.ttl = ttl
+
+    async def get(
+        self, brand_id: str, name: str
+    ) -> tuple[bytes | None, bytes | None]:
+        """
+        Get the cached response of the brand and its generation.
+
+        Call it before reading the data of the response and pass the
+        generation to `set()`. When the brand has no generation yet,
+        one is started and the generation is None, the response is not
+        cached this time.
+        """
+        if self.backend is None:
+            return None, None
+        generation_key = f"brand:{brand_id}:generation"
+        generation = await self.backend.get(generation_key)
+        if generation is None:
+            await self.backend.set(
+                generation_key, str(time.time_ns()).encode(), ttl=self.ttl)
+            return None, None
+        body = await self.backend.get(self._key(brand_id, generation, name))
+        return body, generation
+
+    async def set(
+        self, brand_id: str, name: str, body: bytes, generation: bytes | None
+    ) -> None:
+        """Cache the response of the brand under the generation of `get()`."""
+        if self.backend is None or generation is None:
+            return
+        await self.backend.set(
+            self._key(brand_id, generation, name), body, ttl=self.ttl)
+
+    async def invalidate(self, brand_id: str) -> None:
+        """Invalidate all cached responses of the brand."""
+        if self.backend is None:
+            return
+        await self.backend.set(
+            f"brand:{brand_id}:generation",
+            str(time.time_ns()).encode(),
+            ttl=self.ttl
+        )
+
+    async def close(self) -> None:
+        """Release the resources of the backend."""
+        if self.backend is not None:
+            await self.backend.close()
+
+    @staticmethod
+    def _key(brand_id: str, generation: bytes, name: str) -> str:
+        """Get the key of the response."""
+        return f"brand:{brand_id}:{generation.decode()}:{name}"
+
+
+def create_cache_backend(backend: str) -> CacheBackend | None:
+    """Create the response cache backend."""
+    if backend == "memory":
+        return MemoryCacheBackend(maxsize=settings.RESPONSE_CACHE_SIZE)
+    if backend == "redis":
+        return RedisCacheBackend(url=settings.RESPONSE_CACHE_URL)
+    if backend == "none":
+        return None
+    raise ValueError(f"Unknown cache backend: {backend}")
+
+
+response_cache = ResponseCache(
+    create_cache_backend(settings.RESPONSE_CACHE_BACKEND),
+    ttl=settings.RESPONSE_CACHE_TTL
+)
@@ -11,6 +11,21 @@ class Settings(BaseSettings):
     SECRET_KEY: str = "DO_NOT_USE_IN_PROD"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 20
+    USER_CACHE_TTL: int = 30
+    USER_CACHE_SIZE: int = 1024
+    TOKEN_CACHE_SIZE: int = 4096
+    PASSWORD_HASH_ROUNDS: int = 12
+    PASSWORD_HASH_EXECUTOR: str = "thread"
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_CONCURRENCY: int = 4
+
+    RESPONSE_CACHE_BACKEND: str = "memory"
+    RESPONSE_CACHE_URL: str | None = None
+    RESPONSE_CACHE_TTL: int = 60
+    RESPONSE_CACHE_SIZE: int = 10000
+    EXPORT_BATCH_SIZE: int = 500
+    IMPORT_BATCH_SIZE: int = 1000
+    BULK_BATCH_SIZE: int = 1000
 
     POSTGRES_USER: str = "root"
     POSTGRES_PASSWORD: str = "root"
@@ -18,6 +33,27 @@ class Settings(BaseSettings):
     POSTGRES_PORT: int = 5432
     POSTGRES_DB: str = "dev"
     SQLALCHEMY_DATABASE_URI: str | None = None
+    REPLICA_DATABASE_URI: str | None = None
+    DB_POOL_MIN_SIZE: int = 10
+    DB_POOL_MAX_SIZE: int = 10
+    DB_POOL_ACQUIRE_TIMEOUT: float | None = 10.0
+    DB_STATEMENT_TIMEOUT: int = 30_000
+    DB_CONNECTION_LIFETIME: float = 300.0
+    DB_SLOW_QUERY_THRESHOLD: int = 200
+    # serve /metrics without a superuser token, for scrapers on a
+    # private network
+    METRICS_PUBLIC: bool = False
+
+    BLOB_STORE_BACKEND: str = "local"
+    BLOB_STORE_ROOT: str = "blobs"
+    IMAGE_CHUNK_SIZE: int = 64 * 1024
+    IMAGE_MAX_SIZE: int = 20_000_000
+    IMAGE_THUMBNAIL_SIZE: int = 200
+    IMAGE_MEDIUM_SIZE: int = 800
+    IMAGE_VARIANT_FORMAT: str = "WEBP"
+    IMAGE_VARIANT_QUALITY: int = 80
+    IMAGE_PROCESS_WORKERS: int = 2
+    IMAGE_CACHE_MAX_AGE: int = 24 * 60 * 60
 
     @validator("SQLALCHEMY_DATABASE_URI", pre=True)
     def assemble_db_connection(
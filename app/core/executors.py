@@ -0,0 +1,31 @@
+"""Worker pools for blocking work."""
+from concurrent.futures import (Executor, ProcessPoolExecutor,
+                                ThreadPoolExecutor)
+
+_executors: dict[str, Executor] = {}
+
+
+def get_executor(name: str, kind: str, max_workers: int) -> Executor:
+    """
+    Get the named pool, create it on first use.
+
+    `kind` is either "thread" or "process".
+    """
+    executor = _executors.get(name)
+    if executor is None:
+        if kind == "process":
+            executor = ProcessPoolExecutor(max_workers=max_workers)
+        elif kind == "thread":
+            executor = ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix=name)
+        else:
+            raise ValueError(f"Unknown executor kind: {kind}")
+        _executors[name] = executor
+    return executor
+
+
+def shutdown() -> None:
+    """Shut down all pools."""
+    for executor in _executors.values():
+        executor.shutdown(cancel_futures=True)
+    _executors.clear()
@@ -0,0 +1,116 @@
+"""HTTP helpers."""
+import json
+from datetime import date, datetime
+from typing import Any, AsyncIterator
+from uuid import UUID
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from .. import exceptions as exc
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, fall back to the json module
+    orjson = None
+
+
+def render_json(content: Any) -> bytes:
+    """Render the content to JSON the same way as a FastAPI response."""
+    return JSONResponse(jsonable_encoder(content)).body
+
+
+def _default(obj: Any) -> Any:
+    """Encode the column types the json module doesn't know."""
+    if isinstance(obj, UUID):
+        return str(obj)
+    if isinstance(obj, (date, datetime)):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")  # noqa: E501
+
+
+def dump_json(content: Any) -> bytes:
+    """
+    Dump plain dicts and lists of column values to JSON.
+
+    Unlike `render_json` the content is not walked by `jsonable_encoder`,
+    it is meant for rows that already match the response schema.
+    """
+    if orjson is not None:
+        return orjson.dumps(content, default=_default)
+    return json.dumps(
+        content,
+        default=_default,
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+async def stream_ndjson(
+    batches: AsyncIterator[list[Any]]
+) -> AsyncIterator[bytes]:
+    """Dump each batch of items as newline delimited JSON."""
+    async for batch in batches:
+        yield b"".join(dump_json(item) + b"\n" for item in batch)
+
+
+async def stream_json_array(
+    batches: AsyncIterator[list[Any]]
+) -> AsyncIterator[bytes]:
+    """Dump the batches of items as a single JSON array."""
+    yield b"["
+    separator = b""
+    async for batch in batches:
+        yield separator + b",".join(dump_json(item) for item in batch)
+        separator = b","
+    yield b"]"
+
+
+def etag_matches(header: str | None, etag: str) -> bool:
+    """Check if an `If-None-Match` header matches the etag."""
+    if header is None:
+        return False
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison (RFC 7232)
+    return any(
+        tag.strip().removeprefix("W/") == etag for tag in header.split(",")
+    )
+
+
+def parse_range(header: str | None, size: int) -> tuple[int, int] | None:
+    """
+    Parse a `Range` header into inclusive (start, end) byte offsets.
+
+    Only a single byte range is supported. When the header is missing
+    or can't be honored, return None so the full content is sent.
+    """
+    if not header:
+        return None
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, sep, last = spec.strip().partition("-")
+    if not sep:
+        return None
+    try:
+        if first:
+            start = int(first)
+            end = int(last) if last else None
+            if start < 0 or (end is not None and end < start):
+                return None
+        else:
+            # suffix range: the last N bytes
+            suffix = int(last)
+            if suffix < 0:
+                return None
+            start = max(size - suffix, 0) if suffix else size
+            end = None
+    except ValueError:
+        return None
+    if start >= size:
+        raise exc.RangeNotSatisfiableError("Range not satisfiable", size=size)
+    if end is None or end >= size:
+        end = size - 1
+    return start, end
@@ -0,0 +1,90 @@
+"""Image processing."""
+import asyncio
+import io
+
+from ..core.config import settings
+from ..core.executors import get_executor
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow is optional, variants are skipped without it
+    Image = ImageOps = None
+
+# variant formats that keep the alpha channel
+ALPHA_FORMATS = ("PNG", "WEBP", "TIFF")
+# content types of the accepted uploads (no SVG, it can run scripts)
+CONTENT_TYPES = ("image/png", "image/jpeg", "image/gif", "image/webp")
+# bytes read to detect the content type
+SNIFF_SIZE = 12
+
+
+def is_available() -> bool:
+    """Check if image processing is available."""
+    return Image is not None
+
+
+def sniff_content_type(head: bytes) -> str | None:
+    """
+    Get the content type of an image from its magic bytes.
+
+    The type claimed by the client is never trusted. None when it is
+    not one of `CONTENT_TYPES`.
+    """
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if head.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if head.startswith((b"GIF87a", b"GIF89a")):
+        return "image/gif"
+    if head.startswith(b"RIFF") and head[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
+
+def variant_content_type() -> str:
+    """Get the content type of the resized variants."""
+    return f"image/{settings.IMAGE_VARIANT_FORMAT.lower()}"
+
+
+def make_variants(
+    data: bytes, sizes: dict[str, int], fmt: str, quality: int
+) -> dict[str, bytes]:
+    """
+    Resize the image to fit each of the sizes and encode it.
+
+    Transparency is kept for the formats of `ALPHA_FORMATS`, other
+    formats (e.g. JPEG) get an RGB image. Runs in a worker process,
+    so it only takes and returns picklable values.
+    """
+    with Image.open(io.BytesIO(data)) as img:
+        img = ImageOps.exif_transpose(img)
+        has_alpha = "A" in img.getbands() or "transparency" in img.info
+        if has_alpha and fmt.upper() in ALPHA_FORMATS:
+            if img.mode != "RGBA":
+                img = img.convert("RGBA")
+        elif img.mode != "RGB":
+            img = img.convert("RGB")
+        variants = {}
+        for name, size in sizes.items():
+            resized = img.copy()
+            resized.thumbnail((size, size))
+            buf = io.BytesIO()
+            resized.save(buf, format=fmt, quality=quality)
+            variants[name] = buf.getvalue()
+    return variants
+
+
+async def create_variants(data: bytes) -> dict[str, bytes]:
+    """Create the thumbnail and medium variants in the process pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_executor("imaging", "process", settings.IMAGE_PROCESS_WORKERS),
+        make_variants,
+        data,
+        {
+            "thumbnail": settings.IMAGE_THUMBNAIL_SIZE,
+            "medium": settings.IMAGE_MEDIUM_SIZE,
+        },
+        settings.IMAGE_VARIANT_FORMAT,
+        settings.IMAGE_VARIANT_QUALITY,
+    )
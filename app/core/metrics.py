@@ -0,0 +1,237 @@
+"""Request and query metrics."""
+import bisect
+import logging
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 500, 1000)
+# characters of a slow statement that are logged
+SLOW_QUERY_LOG_SIZE = 1000
+
+
+class Histogram:
+    """
+    Prometheus histogram with labels.
+
+    Kept per worker process, every worker exposes its own values.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...],
+        buckets: tuple[float, ...],
+    ):
+        """Initialize."""
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = buckets
+        # labels -> (per bucket counts, +Inf count, sum)
+        self._series: dict[tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        """Count the value in its bucket."""
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * len(self.buckets), 0, 0.0]
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            series[0][index] += 1
+        series[1] += 1
+        series[2] += value
+
+    def render(self) -> list[str]:
+        """Get the lines of the text exposition format."""
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        for labels, (counts, count, total) in sorted(self._series.items()):
+            pairs = [
+                f'{name}="{_escape(value)}"'
+                for name, value in zip(self.labelnames, labels)
+            ]
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = ",".join([*pairs, f'le="{bound}"'])
+                lines.append(f"{self.name}_bucket{{{le}}} {cumulative}")
+            le = ",".join([*pairs, 'le="+Inf"'])
+            lines.append(f"{self.name}_bucket{{{le}}} {count}")
+            label = "{" + ",".join(pairs) + "}" if pairs else ""
+            lines.append(f"{self.name}_sum{label} {total}")
+            lines.append(f"{self.name}_count{label} {count}")
+        return lines
+
+
+class Counter:
+    """Prometheus counter with labels."""
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: tuple[str, ...]
+    ):
+        """Initialize."""
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._series: dict[tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        """Increase the counter."""
+        self._series[labels] = self._series.get(labels, 0) + amount
+
+    def render(self) -> list[str]:
+        """Get the lines of the text exposition format."""
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} counter",
+        ]
+        for labels, value in sorted(self._series.items()):
+            pairs = ",".join(
+                f'{name}="{_escape(value)}"'
+                for name, value in zip(self.labelnames, labels)
+            )
+            lines.append(f"{self.name}{{{pairs}}} {value}")
+        return lines
+
+
+def _escape(value: str) -> str:
+    """Escape a label value."""
+    return (
+        value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Time to handle the request, including the streamed body.",
+    ("method", "route", "status"),
+    LATENCY_BUCKETS,
+)
+REQUEST_QUERIES = Histogram(
+    "http_request_db_queries",
+    "SQL statements run by the request.",
+    ("method", "route"),
+    COUNT_BUCKETS,
+)
+REQUEST_QUERY_TIME = Histogram(
+    "http_request_db_duration_seconds",
+    "Time the request spent waiting on SQL statements.",
+    ("method", "route"),
+    LATENCY_BUCKETS,
+)
+REQUEST_ROWS = Histogram(
+    "http_request_db_rows",
+    "Rows returned by the SQL statements of the request.",
+    ("method", "route"),
+    COUNT_BUCKETS,
+)
+QUERY_LATENCY = Histogram(
+    "db_query_duration_seconds",
+    "Time of a SQL statement.",
+    ("operation",),
+    LATENCY_BUCKETS,
+)
+SLOW_QUERIES = Counter(
+    "db_slow_queries_total",
+    "SQL statements slower than the slow query threshold.",
+    ("operation",),
+)
+CACHE_HITS = Counter(
+    "cache_hits_total",
+    "Lookups of the in process caches that found a live entry.",
+    ("cache",),
+)
+CACHE_MISSES = Counter(
+    "cache_misses_total",
+    "Lookups of the in process caches that found no live entry.",
+    ("cache",),
+)
+REGISTRY = (
+    REQUEST_LATENCY,
+    REQUEST_QUERIES,
+    REQUEST_QUERY_TIME,
+    REQUEST_ROWS,
+    QUERY_LATENCY,
+    SLOW_QUERIES,
+    CACHE_HITS,
+    CACHE_MISSES,
+)
+
+
+@dataclass
+class RequestStats:
+    """SQL statements run by a request."""
+
+    method: str
+    path: str
+    route: str = "unmatched"
+    queries: int = 0
+    rows: int = 0
+    seconds: float = 0.0
+
+
+_request_stats: ContextVar[RequestStats | None] = ContextVar(
+    "request_stats", default=None)
+
+
+def start_request(method: str, path: str) -> RequestStats:
+    """Collect the statements run from now on in this context."""
+    stats = RequestStats(method, path)
+    _request_stats.set(stats)
+    return stats
+
+
+def observe_request(stats: RequestStats, status: int, seconds: float) -> None:
+    """Record the latency and the statements of a finished request."""
+    REQUEST_LATENCY.observe(seconds, stats.method, stats.route, str(status))
+    REQUEST_QUERIES.observe(stats.queries, stats.method, stats.route)
+    REQUEST_QUERY_TIME.observe(stats.seconds, stats.method, stats.route)
+    REQUEST_ROWS.observe(stats.rows, stats.method, stats.route)
+
+
+def observe_query(
+    operation: str, seconds: float, rows: int, statement: object
+) -> None:
+    """
+    Record a SQL statement.
+
+    Statements slower than `DB_SLOW_QUERY_THRESHOLD` milliseconds are
+    logged with the path of the request. Only the SQL is logged (cut
+    to `SLOW_QUERY_LOG_SIZE` characters), not the parameters.
+    """
+    QUERY_LATENCY.observe(seconds, operation)
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.rows += rows
+        stats.seconds += seconds
+    threshold = settings.DB_SLOW_QUERY_THRESHOLD
+    if threshold and seconds * 1000 >= threshold:
+        SLOW_QUERIES.inc(operation)
+        sql = " ".join(str(statement).split())
+        if len(sql) > SLOW_QUERY_LOG_SIZE:
+            sql = sql[:SLOW_QUERY_LOG_SIZE] + "..."
+        logger.warning(
+            "slow query (%.1f ms, %d rows, %s %s): %s",
+            seconds * 1000,
+            rows,
+            stats.method if stats else "-",
+            stats.path if stats else "-",
+            sql,
+        )
+
+
+def render() -> str:
+    """Get all metrics in the Prometheus text exposition format."""
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,66 @@
+"""ASGI middlewares."""
+import time
+from typing import Any, Callable
+
+from starlette.routing import BaseRoute
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from . import metrics
+
+
+class TimingMiddleware:
+    """
+    Record the latency and the SQL statements of every request.
+
+    A plain ASGI middleware rather than `BaseHTTPMiddleware`: the
+    endpoint runs in the task and the context of the request, so the
+    statements it runs are collected by `metrics.start_request` and the
+    streamed bodies are timed until their last chunk.
+    """
+
+    def __init__(self, app: ASGIApp):
+        """Initialize."""
+        self.app = app
+        self._routes: dict[Callable, str] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        """Handle the request."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stats = metrics.start_request(scope["method"], scope["path"])
+        status = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            stats.route = self._route(scope)
+            metrics.observe_request(
+                stats, status, time.perf_counter() - started)
+
+    def _route(self, scope: Scope) -> str:
+        """Get the path template of the matched route."""
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "unmatched"
+        if endpoint not in self._routes:
+            self._routes = _route_paths(scope["app"].routes)
+            self._routes.setdefault(endpoint, "unmatched")
+        return self._routes[endpoint]
+
+
+def _route_paths(routes: list[BaseRoute]) -> dict[Callable, str]:
+    """Map the endpoints to the path of their route."""
+    paths: dict[Any, str] = {}
+    for route in routes:
+        endpoint = getattr(route, "endpoint", None)
+        if endpoint is not None:
+            paths[endpoint] = getattr(route, "path", "unmatched")
+    return paths
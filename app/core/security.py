@@ -1,13 +1,33 @@
 """Security."""
+import asyncio
+import hashlib
+import time
 from datetime import datetime, timedelta
 
 from jose import jwt
 from passlib.context import CryptContext
 
+from ..core.cache import TTLCache
 from ..core.config import settings
+from ..core.executors import get_executor
 from ..schemas.token import TokenPayload
 
-PWD_CONTEXT = CryptContext(schemes=["bcrypt"], deprecated="auto")
+PWD_CONTEXT = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.PASSWORD_HASH_ROUNDS
+)
+
+# bounds the hashing work queued at once, so a login burst
+# waits here instead of piling up in the pool
+_hash_semaphore = asyncio.Semaphore(settings.PASSWORD_HASH_CONCURRENCY)
+
+# verified token payloads, keyed by the SHA-256 digest of the token
+token_cache = TTLCache(
+    maxsize=settings.TOKEN_CACHE_SIZE,
+    ttl=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+    name="token",
+)
 
 
 def create_access_token(sub: str) -> str:
@@ -36,19 +56,54 @@ def _encode_token(
 
 
 def decode_token(token: str) -> TokenPayload:
-    """Decode token."""
+    """
+    Decode token.
+
+    A verified token is cached until its `exp`, so repeat requests
+    with the same token skip the signature check and validation.
+    """
+    key = hashlib.sha256(token.encode()).digest()
+    token_data = token_cache.get(key)
+    if token_data is not None:
+        return token_data
     payload = jwt.decode(
         token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
     )
     token_data = TokenPayload(**payload)
+    if "exp" in payload:
+        ttl = payload["exp"] - time.time()
+        if ttl > 0:
+            token_cache.set(key, token_data, ttl=ttl)
     return token_data
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify password."""
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify password in the password hashing pool."""
+    return await _run_hasher(_verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash(password: str) -> str:
+    """Encode password in the password hashing pool."""
+    return await _run_hasher(_get_password_hash, password)
+
+
+async def _run_hasher(func, *args):
+    """Run the blocking bcrypt function in the password hashing pool."""
+    executor = get_executor(
+        "password",
+        settings.PASSWORD_HASH_EXECUTOR,
+        settings.PASSWORD_HASH_WORKERS
+    )
+    async with _hash_semaphore:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, func, *args)
+
+
+def _verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify password (blocking)."""
     return PWD_CONTEXT.verify(plain_password, hashed_password)
 
 
-def get_password_hash(password: str) -> str:
-    """Encode password."""
+def _get_password_hash(password: str) -> str:
+    """Encode password (blocking)."""
     return PWD_CONTEXT.hash(password)
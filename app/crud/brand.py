@@ -1,61 +1,178 @@
 """CRUD for brand."""
+from typing import Any
+
+import ormar
+
+from ..core.cache import response_cache
+from ..db.session import read_only
 from ..models.brand import Brand as BrandModel
+from ..models.product import Product as ProductModel
 from ..models.user import User as UserModel
 from ..schemas.brand import BrandCreate, BrandUpdate
+from .pagination import paginate
+from .upsert import insert_unique
 
 
 class CRUDBrand:
 
     @classmethod
-    async def get_all(
-        cls, *, user_obj: UserModel
-    ) -> list[BrandModel]:
-        """Get all brands that belong to current user."""
-        return (
-            await BrandModel.objects
-            .filter(BrandModel.owner.email == user_obj.email)
-            .order_by(BrandModel.created_time.desc())
-            .all()
+    @read_only
+    async def get_all_values(
+        cls,
+        *,
+        user_obj: UserModel,
+        limit: int,
+        cursor: str | None = None,
+        fields: list[str]
+    ) -> tuple[list[dict[str, Any]], str | None]:
+        """
+        Get a page of brands that belong to current user as dicts of `fields`.
+
+        Skips building models, for responses that dump rows as they are.
+        """
+        return await paginate(
+            BrandModel.objects.filter(owner=user_obj.id),
+            BrandModel,
+            limit=limit,
+            cursor=cursor,
+            values=fields
         )
 
     @classmethod
+    @read_only
     async def get_by_id(
         cls, *, brand_id: str, user_obj: UserModel | None = None
     ) -> BrandModel | None:
         """Get the brand by brand id that belong to current user."""
-        brand_obj = (
-            BrandModel.objects.select_related("products")
-            .filter(BrandModel.id == brand_id)
-        )
+        brand_obj = BrandModel.objects.filter(BrandModel.id == brand_id)
         if user_obj:
-            brand_obj = brand_obj.filter(BrandModel.owner.email == user_obj.email)  # noqa: E501
+            brand_obj = brand_obj.filter(owner=user_obj.id)
         return await brand_obj.get_or_none()
 
     @classmethod
-    async def get_by_name(
-        cls, *, name: str, user_obj: UserModel
-    ) -> BrandModel | None:
-        """Get the brand by brand name that belong to current user."""
-        return (
-            await BrandModel.objects
-            .filter(BrandModel.name == name)
-            .filter(BrandModel.owner.email == user_obj.email)
-            .get_or_none()
+    @read_only
+    async def get_values_by_id(
+        cls,
+        *,
+        brand_id: str,
+        fields: list[str],
+        product_fields: list[str] | None = None
+    ) -> tuple[dict[str, Any], str] | None:
+        """
+        Get the brand by brand id as a dict, with its products if asked.
+
+        Returns the brand and its owner id. With `product_fields`, the
+        products (newest first) are read with a second query instead
+        of a join.
+        """
+        rows = await (
+            BrandModel.objects
+            .filter(BrandModel.id == brand_id)
+            .values([*fields, "owner"])
+        )
+        if not rows:
+            return None
+        brand = {name: rows[0][name] for name in fields}
+        if product_fields is None:
+            return brand, str(rows[0]["owner"])
+        products = await (
+            ProductModel.objects
+            .filter(brand=brand_id)
+            .order_by([
+                ProductModel.created_time.desc(), ProductModel.id.desc()])
+            .values(product_fields)
         )
+        brand["products"] = [
+            {name: product[name] for name in product_fields}
+            for product in products
+        ]
+        return brand, str(rows[0]["owner"])
+
+    @classmethod
+    @read_only
+    async def get_many_values(
+        cls,
+        *,
+        brand_ids: list[str],
+        user_obj: UserModel | None,
+        fields: list[str],
+        product_fields: list[str] | None = None
+    ) -> list[dict[str, Any]]:
+        """
+        Get the visible brands of the ids as dicts, with products if asked.
+
+        A brand is visible when it is active or belongs to current
+        user, that is resolved by the query. The brands are read with
+        one query, with `product_fields` the products of all of them
+        (newest first) with a second one. Unknown and hidden ids are
+        left out.
+        """
+        visible = ormar.or_(is_active=True)
+        if user_obj:
+            visible = ormar.or_(is_active=True, owner=user_obj.id)
+        rows = await (
+            BrandModel.objects
+            .filter(BrandModel.id << brand_ids)
+            .filter(visible)
+            .values(fields)
+        )
+        brands = {
+            str(row["id"]): {name: row[name] for name in fields}
+            for row in rows
+        }
+        if product_fields is not None and brands:
+            for brand in brands.values():
+                brand["products"] = []
+            products = await (
+                ProductModel.objects
+                .filter(brand__in=list(brands))
+                .order_by([
+                    ProductModel.created_time.desc(),
+                    ProductModel.id.desc()
+                ])
+                .values([*product_fields, "brand"])
+            )
+            for product in products:
+                brands[str(product["brand"])]["products"].append(
+                    {name: product[name] for name in product_fields})
+        return [
+            brands[brand_id] for brand_id in brand_ids if brand_id in brands]
+
+    @classmethod
+    @read_only
+    async def exists(
+        cls, *, brand_id: str, user_obj: UserModel | None = None
+    ) -> bool:
+        """Check if the brand exists and belong to current user."""
+        brand_obj = BrandModel.objects.filter(BrandModel.id == brand_id)
+        if user_obj:
+            brand_obj = brand_obj.filter(owner=user_obj.id)
+        return await brand_obj.exists()
 
     @classmethod
     async def create(
         cls, *, user_obj: UserModel, obj_in: BrandCreate
     ) -> BrandModel:
-        """Create the brand by current user."""
-        return await BrandModel.objects.create(**obj_in.dict(), owner=user_obj)
+        """Create the brand by current user, unless the name is taken."""
+        return await insert_unique(
+            BrandModel(**obj_in.dict(), owner=user_obj),
+            conflict=["owner", "name"],
+            message="Brand already exists"
+        )
 
     @classmethod
     async def update(
         cls, *, brand_obj: BrandModel, obj_in: BrandUpdate
     ) -> BrandModel:
         """Update the brand."""
-        return await brand_obj.update(**obj_in.dict(exclude_unset=True))
+        update_data = obj_in.dict(exclude_unset=True)
+        if not update_data:
+            return brand_obj
+        # only the given columns, the product summary is not overwritten
+        brand = await brand_obj.update(
+            _columns=list(update_data), **update_data)
+        await response_cache.invalidate(brand.id)
+        return brand
 
     @classmethod
     async def remove(
@@ -63,9 +180,15 @@ class CRUDBrand:
     ) -> BrandModel:
         """Delete the brand."""
         await brand_obj.delete()
+        await response_cache.invalidate(brand_obj.id)
         return brand_obj
 
     @staticmethod
     def is_active(brand: BrandModel) -> bool:
         """Check if brand is active."""
         return brand.is_active
+
+    @staticmethod
+    def is_owner(brand: BrandModel, user: UserModel) -> bool:
+        """Check if brand belongs to the user."""
+        return brand.owner is not None and brand.owner.pk == user.pk
@@ -0,0 +1,78 @@
+"""Keyset pagination."""
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Type
+
+import ormar
+
+from .. import exceptions as exc
+
+
+def encode_cursor(*values: Any) -> str:
+    """Encode the sort key of the last row into an opaque cursor."""
+    raw = json.dumps(
+        [v.isoformat() if isinstance(v, datetime) else v for v in values],
+        separators=(",", ":")
+    )
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list[Any]:
+    """Decode a cursor into the sort key of the last row."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded))
+    except (ValueError, binascii.Error):
+        raise exc.FormatError("Invalid cursor")
+    if not isinstance(values, list):
+        raise exc.FormatError("Invalid cursor")
+    return values
+
+
+async def paginate(
+    queryset: ormar.QuerySet,
+    model: Type[ormar.Model],
+    *,
+    limit: int,
+    cursor: str | None = None,
+    values: list[str] | None = None
+) -> tuple[list[ormar.Model] | list[dict[str, Any]], str | None]:
+    """
+    Get a page of rows ordered by (created_time, id) descending.
+
+    The cursor filter is written as `created_time <= t AND (created_time
+    < t OR id < last_id)`, so the database can seek a (..., created_time,
+    id) index straight to the page instead of scanning the pages before.
+
+    With `values`, return dicts of those columns (in that order)
+    instead of models.
+    """
+    if cursor:
+        last = decode_cursor(cursor)
+        try:
+            created_time, last_id = datetime.fromisoformat(last[0]), str(last[1])  # noqa: E501
+        except (ValueError, TypeError, IndexError):
+            raise exc.FormatError("Invalid cursor")
+        queryset = queryset.filter(
+            (model.created_time <= created_time)
+            & ((model.created_time < created_time) | (model.id < last_id))
+        )
+    queryset = (
+        queryset
+        .order_by([model.created_time.desc(), model.id.desc()])
+        .limit(limit + 1)
+    )
+    if not values:
+        rows = await queryset.all()
+        if len(rows) <= limit:
+            return rows, None
+        rows = rows[:limit]
+        return rows, encode_cursor(rows[-1].created_time, str(rows[-1].id))
+    rows = await queryset.values([*values, "created_time", "id"])
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]["created_time"], str(rows[-1]["id"]))  # noqa: E501
+    return [{name: row[name] for name in values} for row in rows], next_cursor
@@ -1,34 +1,261 @@
 """CRUD for product."""
+import logging
+from datetime import datetime
+from typing import Any, AsyncIterator
+from uuid import uuid4
+
+import sqlalchemy
+from databases.core import Connection
 from fastapi import UploadFile
+from pydantic import ValidationError
+from sqlalchemy.dialects.postgresql import TSVECTOR, insert
 
+from .. import exceptions as exc
+from ..core import imaging
+from ..core.cache import response_cache
+from ..core.config import settings
+from ..db.session import database, read_only
 from ..models.brand import Brand as BrandModel
 from ..models.product import Product as ProductModel
 from ..schemas.product import ProductCreate, ProductUpdate
+from ..storage.store import blob_store
+from .pagination import decode_cursor, encode_cursor, paginate
+from .upsert import insert_unique
+
+logger = logging.getLogger(__name__)
+
+# the text search config of the generated `product.search_vector` column
+SEARCH_CONFIG = "english"
 
 
 class CRUDProduct:
 
     @classmethod
-    async def get_all(
-        cls, *, brand_id: str
-    ) -> list[ProductModel]:
-        """Get all products for that brand."""
+    @read_only
+    async def get_all_values(
+        cls,
+        *,
+        brand_id: str,
+        limit: int,
+        cursor: str | None = None,
+        fields: list[str]
+    ) -> tuple[list[dict[str, Any]], str | None]:
+        """
+        Get a page of products for that brand as dicts of `fields`.
+
+        Skips building models, for responses that dump rows as they are.
+        """
+        return await paginate(
+            ProductModel.objects.filter(brand=brand_id),
+            ProductModel,
+            limit=limit,
+            cursor=cursor,
+            values=fields
+        )
+
+    @classmethod
+    async def iterate_values(
+        cls,
+        *,
+        brand_id: str,
+        fields: list[str],
+        batch_size: int
+    ) -> AsyncIterator[list[dict[str, Any]]]:
+        """
+        Iterate over all products of that brand in batches, newest first.
+
+        Each product is a dict of `fields`. Rows are read through a
+        server-side cursor, so the catalog is never loaded at once.
+        """
+        table = ProductModel.Meta.table
+        query = (
+            sqlalchemy.select([table.c[name] for name in fields])
+            .where(table.c.brand == brand_id)
+            .order_by(table.c.created_time.desc(), table.c.id.desc())
+        )
+        with database.prefer_replica():
+            connection = database.connection()
+        batch = []
+        async with connection:
+            async for row in connection.iterate(query):
+                batch.append({name: row[name] for name in fields})
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+        if batch:
+            yield batch
+
+    @classmethod
+    @read_only
+    async def get_catalog(
+        cls,
+        *,
+        min_discount: float | None = None,
+        max_discount: float | None = None,
+        created_after: datetime | None = None,
+        created_before: datetime | None = None,
+        brand_ids: list[str] | None = None,
+        sort: str = "recent",
+        limit: int,
+        cursor: str | None = None,
+        fields: list[str]
+    ) -> tuple[list[dict[str, Any]], str | None]:
+        """
+        Get a page of products of all active brands.
+
+        Sorted by `recent` (created_time, id) or `discount`
+        (discount_rate, created_time, id), both descending, so a page
+        is a backward range scan of the matching composite index.
+        Each product is a dict of `fields` with `brand_id`.
+        """
+        table = ProductModel.Meta.table
+        brand = BrandModel.Meta.table
+        sort_key = [table.c.created_time, table.c.id]
+        if sort == "discount":
+            sort_key.insert(0, table.c.discount_rate)
+        statement = (
+            sqlalchemy.select([
+                *(table.c[name] for name in fields),
+                table.c.brand.label("brand_id"),
+                *(column for column in sort_key if column.name not in fields),
+            ])
+            .select_from(table.join(brand, brand.c.id == table.c.brand))
+            .where(brand.c.is_active.is_(True))
+        )
+        if min_discount is not None:
+            statement = statement.where(table.c.discount_rate >= min_discount)
+        if max_discount is not None:
+            statement = statement.where(table.c.discount_rate <= max_discount)
+        if created_after is not None:
+            statement = statement.where(table.c.created_time >= created_after)
+        if created_before is not None:
+            statement = statement.where(table.c.created_time < created_before)
+        if brand_ids:
+            statement = statement.where(table.c.brand.in_(brand_ids))
+        if cursor:
+            last = decode_cursor(cursor)
+            try:
+                if len(last) != len(sort_key):
+                    raise ValueError
+                last[-2] = datetime.fromisoformat(last[-2])
+                last[-1] = str(last[-1])
+                if sort == "discount":
+                    last[0] = float(last[0])
+            except (ValueError, TypeError):
+                raise exc.FormatError("Invalid cursor")
+            statement = statement.where(
+                sqlalchemy.tuple_(*sort_key) < sqlalchemy.tuple_(*last))
+        rows = await database.fetch_all(
+            statement
+            .order_by(*(column.desc() for column in sort_key))
+            .limit(limit + 1)
+        )
+        results = [
+            {
+                **{name: row[name] for name in fields},
+                "brand_id": row["brand_id"],
+            }
+            for row in rows[:limit]
+        ]
+        next_cursor = None
+        if len(rows) > limit:
+            next_cursor = encode_cursor(
+                *(rows[limit - 1][column.name] for column in sort_key[:-1]),
+                str(rows[limit - 1]["id"])
+            )
+        return results, next_cursor
+
+    @classmethod
+    @read_only
+    async def search(
+        cls,
+        *,
+        q: str,
+        brand_id: str | None = None,
+        limit: int,
+        cursor: str | None = None,
+        fields: list[str]
+    ) -> tuple[list[dict[str, Any]], str | None]:
+        """
+        Search products by title and description, best match first.
+
+        Matches use the GIN index of `product.search_vector`. Without
+        `brand_id` only products of active brands are searched. Each
+        result is a dict of `fields` with `brand_id` and `rank`.
+        """
+        table = ProductModel.Meta.table
+        search_vector = sqlalchemy.literal_column(
+            "product.search_vector", TSVECTOR)
+        query = sqlalchemy.func.websearch_to_tsquery(
+            sqlalchemy.literal_column(f"'{SEARCH_CONFIG}'::regconfig"), q)
+        rank = sqlalchemy.func.ts_rank_cd(search_vector, query)
+        statement = (
+            sqlalchemy.select([
+                table.c.id,
+                *(table.c[name] for name in fields if name != "id"),
+                table.c.brand.label("brand_id"),
+                rank.label("rank"),
+            ])
+            .where(search_vector.op("@@")(query))
+        )
+        if brand_id:
+            statement = statement.where(table.c.brand == brand_id)
+        else:
+            brand = BrandModel.Meta.table
+            statement = (
+                statement
+                .select_from(table.join(brand, brand.c.id == table.c.brand))
+                .where(brand.c.is_active.is_(True))
+            )
+        if cursor:
+            last = decode_cursor(cursor)
+            try:
+                last_rank, last_id = float(last[0]), str(last[1])
+            except (ValueError, TypeError, IndexError):
+                raise exc.FormatError("Invalid cursor")
+            statement = statement.where(
+                (rank < last_rank)
+                | ((rank == last_rank) & (table.c.id > last_id))
+            )
+        rows = await database.fetch_all(
+            statement.order_by(rank.desc(), table.c.id).limit(limit + 1))
+        results = [
+            {
+                **{name: row[name] for name in fields},
+                "brand_id": row["brand_id"],
+                "rank": row["rank"],
+            }
+            for row in rows[:limit]
+        ]
+        next_cursor = None
+        if len(rows) > limit:
+            next_cursor = encode_cursor(
+                results[-1]["rank"], str(rows[limit - 1]["id"]))
+        return results, next_cursor
+
+    @classmethod
+    @read_only
+    async def get_by_id(
+        cls, *, product_id: str, brand_id: str
+    ) -> ProductModel | None:
+        """Get a product for that brand by product id."""
         return (
-            await ProductModel.objects.select_related("brand")
-            .filter(ProductModel.brand.id == brand_id)
-            .order_by(ProductModel.created_time.desc())
-            .all()
+            await ProductModel.objects
+            .filter(ProductModel.id == product_id)
+            .filter(brand=brand_id)
+            .get_or_none()
         )
 
     @classmethod
+    @read_only
     async def get_by_title(
-        cls, *, title: str, brand_obj: BrandModel
+        cls, *, title: str, brand_id: str
     ) -> ProductModel | None:
         """Get a product for that brand by product title."""
         return (
-            await ProductModel.objects.select_related("brand")
+            await ProductModel.objects
             .filter(ProductModel.title == title)
-            .filter(ProductModel.brand.id == brand_obj.id)
+            .filter(brand=brand_id)
             .get_or_none()
         )
 
@@ -40,10 +267,119 @@ class CRUDProduct:
         img_obj: UploadFile | None = None,
         obj_in: ProductCreate
     ) -> ProductModel:
-        """Create a product for that brand."""
-        content = await img_obj.read() if img_obj else None
-        return await ProductModel.objects.create(
-            **obj_in.dict(), image=content, brand=brand_obj)
+        """
+        Create a product for that brand, unless the title is taken.
+
+        The content type of the image is detected from its content.
+        """
+        image_id = image_type = None
+        if img_obj:
+            image_type = imaging.sniff_content_type(
+                await img_obj.read(imaging.SNIFF_SIZE))
+            if image_type is None:
+                raise exc.UnsupportedMediaTypeError(
+                    "The image must be a PNG, JPEG, GIF or WEBP file")
+            await img_obj.seek(0)
+            image_id = await blob_store.put_stream(
+                _read_chunks(img_obj, settings.IMAGE_CHUNK_SIZE),
+                max_size=settings.IMAGE_MAX_SIZE
+            )
+        async with (
+            database.primary_connection() as connection,
+            connection.transaction(),
+        ):
+            product = await insert_unique(
+                ProductModel(
+                    **obj_in.dict(),
+                    image_id=image_id,
+                    image_type=image_type,
+                    brand=brand_obj
+                ),
+                conflict=["brand", "title"],
+                message="Product already exists"
+            )
+            await _update_summary(connection, brand_obj.id, added=1)
+        await response_cache.invalidate(brand_obj.id)
+        return product
+
+    @classmethod
+    async def bulk_create(
+        cls,
+        *,
+        brand_id: str,
+        batches: AsyncIterator[list[tuple[int, dict[str, Any]]]]
+    ) -> list[dict[str, Any]]:
+        """
+        Create products for that brand from batches of numbered rows.
+
+        Each batch is validated and inserted with a multi-row
+        `INSERT ... ON CONFLICT DO NOTHING RETURNING`, rows whose title
+        already exists are not returned. The whole import runs in one
+        transaction. Returns a result per row.
+        """
+        table = ProductModel.Meta.table
+        results = []
+        seen = set()
+        created = 0
+        async with (
+            database.primary_connection() as connection,
+            connection.transaction(),
+        ):
+            async for batch in batches:
+                values = {}
+                for row, data in batch:
+                    try:
+                        item = ProductCreate(**data)
+                    except ValidationError as e:
+                        results.append({
+                            "row": row,
+                            "status": "invalid",
+                            "errors": [
+                                f"{'.'.join(map(str, err['loc']))}: {err['msg']}"  # noqa: E501
+                                for err in e.errors()
+                            ],
+                        })
+                        continue
+                    if item.title in seen:
+                        results.append({
+                            "row": row,
+                            "status": "conflict",
+                            "errors": ["title: duplicated in the import"],
+                        })
+                        continue
+                    seen.add(item.title)
+                    values[row] = {
+                        **item.dict(),
+                        "id": str(uuid4()),
+                        "created_time": datetime.now(),
+                        "brand": brand_id,
+                    }
+                if not values:
+                    continue
+                inserted = {
+                    str(record["id"]) for record in await connection.fetch_all(
+                        insert(table)
+                        .values(list(values.values()))
+                        .on_conflict_do_nothing(
+                            index_elements=["brand", "title"])
+                        .returning(table.c.id)
+                    )
+                }
+                for row, value in values.items():
+                    if value["id"] in inserted:
+                        results.append(
+                            {"row": row, "status": "created", "id": value["id"]})  # noqa: E501
+                    else:
+                        results.append({
+                            "row": row,
+                            "status": "conflict",
+                            "errors": ["title: product already exists"],
+                        })
+                created += len(inserted)
+            if created:
+                await _update_summary(connection, brand_id, added=created)
+        await response_cache.invalidate(brand_id)
+        return sorted(results, key=lambda result: result["row"])
 
     @classmethod
     async def update(
@@ -53,12 +389,212 @@ class CRUDProduct:
         obj_in: ProductUpdate
     ) -> ProductModel:
         """Update a product."""
-        return await product_obj.update(**obj_in.dict(exclude_unset=True))
+        update_data = obj_in.dict(exclude_unset=True)
+        async with (
+            database.primary_connection() as connection,
+            connection.transaction(),
+        ):
+            product = await product_obj.update(
+                _columns=list(update_data), **update_data)
+            await _update_summary(connection, product.brand.pk)
+        await response_cache.invalidate(product.brand.pk)
+        return product
+
+    @classmethod
+    async def bulk_update(
+        cls,
+        *,
+        brand_id: str,
+        ids: list[str],
+        titles: list[str],
+        obj_in: ProductUpdate,
+        batch_size: int
+    ) -> tuple[int, list[dict[str, Any]]]:
+        """
+        Update the products of that brand selected by ids and titles.
+
+        The products are looked up and updated with one statement per
+        batch of ids, in one transaction. Returns the number of
+        affected products and a result per id and title.
+        """
+        table = ProductModel.Meta.table
+        async with (
+            database.primary_connection() as connection,
+            connection.transaction(),
+        ):
+            found = await _find_products(
+                connection, brand_id, ids, titles, batch_size)
+            product_ids = list(found)
+            for start in range(0, len(product_ids), batch_size):
+                await connection.execute(
+                    table.update()
+                    .where(table.c.id.in_(product_ids[start:start + batch_size]))  # noqa: E501
+                    .values(**obj_in.dict(exclude_unset=True))
+                )
+            if found:
+                await _update_summary(connection, brand_id)
+        await response_cache.invalidate(brand_id)
+        return len(found), _bulk_results(found, ids, titles, "updated")
+
+    @classmethod
+    async def bulk_remove(
+        cls,
+        *,
+        brand_id: str,
+        ids: list[str],
+        titles: list[str],
+        batch_size: int
+    ) -> tuple[int, list[dict[str, Any]]]:
+        """
+        Delete the products of that brand selected by ids and titles.
+
+        The products are looked up and deleted with one statement per
+        batch of ids, in one transaction. Returns the number of
+        affected products and a result per id and title.
+        """
+        table = ProductModel.Meta.table
+        async with (
+            database.primary_connection() as connection,
+            connection.transaction(),
+        ):
+            found = await _find_products(
+                connection, brand_id, ids, titles, batch_size)
+            product_ids = list(found)
+            for start in range(0, len(product_ids), batch_size):
+                await connection.execute(
+                    table.delete()
+                    .where(table.c.id.in_(product_ids[start:start + batch_size]))  # noqa: E501
+                )
+            if found:
+                await _update_summary(connection, brand_id, added=-len(found))
+        await response_cache.invalidate(brand_id)
+        return len(found), _bulk_results(found, ids, titles, "deleted")
+
+    @classmethod
+    async def create_image_variants(
+        cls, *, product_obj: ProductModel
+    ) -> ProductModel:
+        """
+        Create the thumbnail and medium variants of the product image.
+
+        Meant to run as a background task after the product is created,
+        the resizing itself runs in a process pool.
+        """
+        if not product_obj.image_id:
+            return product_obj
+        if not imaging.is_available():
+            logger.warning("Pillow is not installed, skip image variants")
+            return product_obj
+        data = await blob_store.get(product_obj.image_id)
+        if data is None:
+            return product_obj
+        try:
+            variants = await imaging.create_variants(data)
+        except Exception:
+            logger.exception(
+                "Failed to create image variants of product %s",
+                product_obj.id
+            )
+            return product_obj
+        product = await product_obj.update(
+            _columns=["image_thumbnail_id", "image_medium_id"],
+            image_thumbnail_id=await blob_store.put(variants["thumbnail"]),
+            image_medium_id=await blob_store.put(variants["medium"]),
+        )
+        await response_cache.invalidate(product.brand.pk)
+        return product
 
     @classmethod
     async def remove(
         cls, *, product_obj: ProductModel
     ) -> ProductModel:
         """Delete a product."""
-        await product_obj.delete()
+        brand_id = product_obj.brand.pk
+        async with (
+            database.primary_connection() as connection,
+            connection.transaction(),
+        ):
+            await product_obj.delete()
+            await _update_summary(connection, brand_id, added=-1)
+        await response_cache.invalidate(brand_id)
         return product_obj
+
+
+async def _read_chunks(
+    file: UploadFile, chunk_size: int
+) -> AsyncIterator[bytes]:
+    """Read the uploaded file in chunks."""
+    while chunk := await file.read(chunk_size):
+        yield chunk
+
+
+async def _update_summary(
+    connection: Connection, brand_id: str, *, added: int = 0
+) -> None:
+    """
+    Update the product summary of the brand after its products changed.
+
+    The count moves by `added` and the max discount is read back from
+    the `(brand, discount_rate)` index, so no products are scanned.
+    Run it in the transaction of the change on its connection, see
+    `RoutingDatabase.primary_connection()`.
+    """
+    brand = BrandModel.Meta.table
+    table = ProductModel.Meta.table
+    await connection.execute(
+        brand.update()
+        .where(brand.c.id == brand_id)
+        .values(
+            product_count=brand.c.product_count + added,
+            max_discount_rate=(
+                sqlalchemy.select([sqlalchemy.func.max(table.c.discount_rate)])
+                .where(table.c.brand == brand_id)
+                .scalar_subquery()
+            ),
+            products_updated_time=datetime.now(),
+        )
+    )
+
+
+async def _find_products(
+    connection: Connection,
+    brand_id: str,
+    ids: list[str],
+    titles: list[str],
+    batch_size: int
+) -> dict[str, str]:
+    """
+    Find and lock the products of that brand by ids and titles.
+
+    Run it in the transaction of the change on its connection, the
+    locks are held until it ends. Returns the title of each found
+    product by id.
+    """
+    table = ProductModel.Meta.table
+    found = {}
+    for column, keys in ((table.c.id, ids), (table.c.title, titles)):
+        for start in range(0, len(keys), batch_size):
+            rows = await connection.fetch_all(
+                sqlalchemy.select([table.c.id, table.c.title])
+                .where(table.c.brand == brand_id)
+                .where(column.in_(keys[start:start + batch_size]))
+                .with_for_update()
+            )
+            found.update({str(row["id"]): row["title"] for row in rows})
+    return found
+
+
+def _bulk_results(
+    found: dict[str, str], ids: list[str], titles: list[str], status: str
+) -> list[dict[str, Any]]:
+    """Get the result of each id and title of a bulk operation."""
+    found_titles = {title: product_id for product_id, title in found.items()}
+    return [
+        {"id": product_id, "title": found.get(product_id),
+         "status": status if product_id in found else "not_found"}
+        for product_id in ids
+    ] + [
+        {"id": found_titles.get(title), "title": title,
+         "status": status if title in found_titles else "not_found"}
+        for title in titles
+    ]
@@ -0,0 +1,36 @@
+"""Single statement inserts."""
+from typing import TypeVar
+
+import ormar
+from sqlalchemy.dialects.postgresql import insert
+
+from .. import exceptions as exc
+
+T = TypeVar("T", bound=ormar.Model)
+
+
+async def insert_unique(obj: T, *, conflict: list[str], message: str) -> T:
+    """
+    Insert the model unless it violates a unique constraint.
+
+    Raises `ConflictError` with the message when a row with the same
+    `conflict` columns already exists. The duplicate check and the
+    insert are one `INSERT ... ON CONFLICT DO NOTHING RETURNING`
+    statement, so concurrent duplicates can't race past the check
+    into an integrity error.
+    """
+    fields = obj.populate_default_values(obj._extract_model_db_fields())
+    related = obj.extract_related_names()
+    obj.update_from_dict(
+        {k: v for k, v in fields.items() if k not in related})
+    table = obj.Meta.table
+    query = (
+        insert(table)
+        .values(**obj.translate_columns_to_aliases(fields))
+        .on_conflict_do_nothing(index_elements=conflict)
+        .returning(table.c[obj.get_column_alias(obj.Meta.pkname)])
+    )
+    if await obj.Meta.database.execute(query) is None:
+        raise exc.ConflictError(message)
+    obj.set_save_status(True)
+    return obj
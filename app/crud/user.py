@@ -1,33 +1,83 @@
 """CRUD for user."""
 from typing import Any
 
+from ..core.cache import TTLCache
+from ..core.config import settings
 from ..core.security import get_password_hash, verify_password
+from ..db.session import read_only
 from ..models.user import User as UserModel
-from ..schemas.user import UserCreate
+from ..schemas.user import UserCreate, UserUpdate
+from .upsert import insert_unique
+
+# users resolved from access tokens, keyed by email (the token subject)
+user_cache = TTLCache(
+    maxsize=settings.USER_CACHE_SIZE, ttl=settings.USER_CACHE_TTL, name="user")
 
 
 class CRUDUser:
 
     @classmethod
+    @read_only
     async def get_by_email(
-        cls, *, email: str
+        cls, *, email: str, cached: bool = False
     ) -> UserModel | None:
-        """Get user by email."""
-        return await UserModel.objects.filter(email=email).get_or_none()
+        """
+        Get user by email.
+
+        With `cached`, the user is served from `user_cache` for up to
+        `USER_CACHE_TTL` seconds. Each call gets its own model instance,
+        so requests never share (and mutate) the same object.
+        """
+        if cached:
+            data = user_cache.get(email)
+            if data is not None:
+                return UserModel(**data)
+        user = await UserModel.objects.filter(email=email).get_or_none()
+        if cached and user is not None:
+            user_cache.set(email, user.dict(exclude={"brands"}))
+        return user
 
     @classmethod
     async def create(
         cls, *, obj_in: UserCreate | dict[str, Any]
     ) -> UserModel:
-        """Create a user."""
+        """Create a user, unless the email is registered."""
         if isinstance(obj_in, dict):
             create_data = obj_in.copy()
         else:
             create_data = obj_in.dict()
-        hashed_password = get_password_hash(create_data["password"])
+        hashed_password = await get_password_hash(create_data["password"])
         del create_data["password"]
-        db_obj = UserModel(**create_data, hashed_password=hashed_password)
-        return await db_obj.save()
+        return await insert_unique(
+            UserModel(**create_data, hashed_password=hashed_password),
+            conflict=["email"],
+            message="Email already registered"
+        )
+
+    @classmethod
+    async def update(
+        cls, *, user_obj: UserModel, obj_in: UserUpdate | dict[str, Any]
+    ) -> UserModel:
+        """Update a user."""
+        if isinstance(obj_in, dict):
+            update_data = obj_in.copy()
+        else:
+            update_data = obj_in.dict(exclude_unset=True)
+        if "password" in update_data:
+            update_data["hashed_password"] = await get_password_hash(
+                update_data.pop("password"))
+        user = await user_obj.update(_columns=list(update_data), **update_data)
+        user_cache.delete(user.email)
+        return user
+
+    @classmethod
+    async def remove(
+        cls, *, user_obj: UserModel
+    ) -> UserModel:
+        """Delete a user."""
+        await user_obj.delete()
+        user_cache.delete(user_obj.email)
+        return user_obj
 
     @staticmethod
     async def authenticate(
@@ -39,7 +89,7 @@ class CRUDUser:
         user = await CRUDUser.get_by_email(email=email)
         if not user:
             return None
-        if not verify_password(password, user.hashed_password):
+        if not await verify_password(password, user.hashed_password):
             return None
         return user
 
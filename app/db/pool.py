@@ -0,0 +1,180 @@
+"""Connection pool."""
+import asyncio
+import time
+from typing import Any, AsyncGenerator
+
+from databases import Database
+from databases.core import Connection
+
+from .. import exceptions as exc
+from ..core.metrics import observe_query
+
+
+class MeteredPool:
+    """
+    Wrap an asyncpg pool to bound and count connection acquires.
+
+    Acquiring waits at most `acquire_timeout` seconds for a free
+    connection, then fails with `ServiceUnavailableError` instead of
+    queueing the request forever. Everything else is delegated.
+    """
+
+    def __init__(self, pool: Any, acquire_timeout: float | None):
+        """Initialize."""
+        self.pool = pool
+        self.acquire_timeout = acquire_timeout
+        self.waiting = 0
+        self.acquires = 0
+        self.timeouts = 0
+        self.wait_seconds = 0.0
+
+    async def acquire(self) -> Any:
+        """Acquire a connection, count the time spent waiting."""
+        self.waiting += 1
+        started = time.perf_counter()
+        try:
+            connection = await self.pool.acquire(timeout=self.acquire_timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise exc.ServiceUnavailableError(
+                "No database connection available")
+        finally:
+            self.waiting -= 1
+            self.wait_seconds += time.perf_counter() - started
+        self.acquires += 1
+        return connection
+
+    def stats(self) -> dict[str, Any]:
+        """Get the connection counts and acquire counters."""
+        size = self.pool.get_size()
+        idle = self.pool.get_idle_size()
+        return {
+            "min_size": self.pool.get_min_size(),
+            "max_size": self.pool.get_max_size(),
+            "size": size,
+            "in_use": size - idle,
+            "idle": idle,
+            "waiting": self.waiting,
+            "acquires": self.acquires,
+            "timeouts": self.timeouts,
+            "wait_seconds": round(self.wait_seconds, 6),
+        }
+
+    def __getattr__(self, name: str) -> Any:
+        """Delegate to the asyncpg pool."""
+        return getattr(self.pool, name)
+
+
+class MeteredConnection(Connection):
+    """Connection that records the time and the rows of every statement."""
+
+    async def fetch_all(self, query: Any, values: dict | None = None) -> Any:
+        """Fetch all rows."""
+        started = time.perf_counter()
+        rows = await super().fetch_all(query, values)
+        observe_query(
+            "fetch_all", time.perf_counter() - started, len(rows), query)
+        return rows
+
+    async def fetch_one(self, query: Any, values: dict | None = None) -> Any:
+        """Fetch the first row."""
+        started = time.perf_counter()
+        row = await super().fetch_one(query, values)
+        observe_query(
+            "fetch_one", time.perf_counter() - started, row is not None, query)
+        return row
+
+    async def fetch_val(
+        self, query: Any, values: dict | None = None, column: Any = 0
+    ) -> Any:
+        """Fetch a value of the first row."""
+        started = time.perf_counter()
+        value = await super().fetch_val(query, values, column=column)
+        observe_query(
+            "fetch_val", time.perf_counter() - started, value is not None,
+            query)
+        return value
+
+    async def execute(self, query: Any, values: dict | None = None) -> Any:
+        """Execute the statement, count the returned value as a row."""
+        started = time.perf_counter()
+        result = await super().execute(query, values)
+        observe_query(
+            "execute", time.perf_counter() - started, result is not None,
+            query)
+        return result
+
+    async def execute_many(self, query: Any, values: list) -> None:
+        """Execute the statement for each values."""
+        started = time.perf_counter()
+        await super().execute_many(query, values)
+        observe_query("execute_many", time.perf_counter() - started, 0, query)
+
+    async def iterate(
+        self, query: Any, values: dict | None = None
+    ) -> AsyncGenerator[Any, None]:
+        """Iterate the rows, the time spent by the consumer is excluded."""
+        seconds = 0.0
+        rows = 0
+        started = time.perf_counter()
+        try:
+            async for row in super().iterate(query, values):
+                seconds += time.perf_counter() - started
+                rows += 1
+                yield row
+                started = time.perf_counter()
+            seconds += time.perf_counter() - started
+        finally:
+            observe_query("iterate", seconds, rows, query)
+
+
+class PooledDatabase(Database):
+    """
+    Database with a metered connection pool (postgres only).
+
+    Statements are recorded for every backend.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        *,
+        min_size: int,
+        max_size: int,
+        acquire_timeout: float | None,
+        statement_timeout: int,
+        connection_lifetime: float,
+        **options: Any
+    ):
+        """Initialize."""
+        self.metered = url.startswith("postgresql")
+        if self.metered:
+            options.update(
+                min_size=min_size,
+                max_size=max_size,
+                max_inactive_connection_lifetime=connection_lifetime,
+                # enforced by the server, in milliseconds (0 disables it)
+                server_settings={"statement_timeout": str(statement_timeout)},
+            )
+        super().__init__(url, **options)
+        self.acquire_timeout = acquire_timeout
+
+    def _new_connection(self) -> Connection:
+        """Create the connection of the current context."""
+        connection = MeteredConnection(self._backend)
+        self._connection_context.set(connection)
+        return connection
+
+    async def connect(self) -> None:
+        """Connect and wrap the pool of the backend."""
+        await super().connect()
+        pool = self._backend._pool
+        if self.metered and not isinstance(pool, MeteredPool):
+            self._backend._pool = MeteredPool(pool, self.acquire_timeout)
+
+    def pool_stats(self) -> dict[str, Any] | None:
+        """Get the pool metrics, None if the backend has no pool."""
+        pool = getattr(self._backend, "_pool", None)
+        if not isinstance(pool, MeteredPool):
+            return None
+        return pool.stats()
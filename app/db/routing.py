@@ -0,0 +1,110 @@
+"""Read replica routing."""
+import contextlib
+from contextvars import ContextVar
+from typing import Any, Iterator
+
+from databases.core import Connection, Transaction
+
+from .pool import PooledDatabase
+
+
+class RoutingDatabase(PooledDatabase):
+    """
+    Database that can send read-only queries to a replica.
+
+    Queries run on the primary unless they run in `prefer_replica()`.
+    Once the current request has written, started a transaction or
+    called `use_primary()`, even those go to the primary, so a request
+    always reads its own writes. This is tracked with context
+    variables, every request task gets a fresh copy of them.
+    """
+
+    def __init__(
+        self, url: str, *, replica_url: str | None = None, **options: Any
+    ):
+        """Initialize."""
+        super().__init__(url, **options)
+        self.replica = (
+            PooledDatabase(replica_url, **options) if replica_url else None)
+        self._use_replica = ContextVar("use_replica", default=False)
+        self._wrote = ContextVar("wrote", default=False)
+
+    async def connect(self) -> None:
+        """Connect the primary and the replica."""
+        await super().connect()
+        if self.replica is not None:
+            await self.replica.connect()
+
+    async def disconnect(self) -> None:
+        """Disconnect the primary and the replica."""
+        await super().disconnect()
+        if self.replica is not None:
+            await self.replica.disconnect()
+
+    @contextlib.contextmanager
+    def prefer_replica(self) -> Iterator[None]:
+        """Run the queries of the block on the replica when possible."""
+        token = self._use_replica.set(True)
+        try:
+            yield
+        finally:
+            self._use_replica.reset(token)
+
+    def use_primary(self) -> None:
+        """Run the rest of the queries of the context on the primary."""
+        self._wrote.set(True)
+
+    def primary_connection(self) -> Connection:
+        """
+        Get the connection of the primary, for writes.
+
+        It is the connection of the context, the one that the queries
+        of ormar models and of `database` run on too. So in
+
+            async with (
+                database.primary_connection() as connection,
+                connection.transaction(),
+            ):
+                await model.update(...)
+                await connection.execute(...)
+
+        both statements run in the transaction.
+        """
+        self.use_primary()
+        return super().connection()
+
+    def connection(self) -> Connection:
+        """Get the connection of the replica or the primary."""
+        if (
+            self.replica is not None
+            and self._use_replica.get()
+            and not self._wrote.get()
+        ):
+            return self.replica.connection()
+        return super().connection()
+
+    async def execute(self, query: Any, values: dict | None = None) -> Any:
+        """Execute a write on the primary."""
+        self._wrote.set(True)
+        return await super().execute(query, values)
+
+    async def execute_many(self, query: Any, values: list) -> None:
+        """Execute a write for each values on the primary."""
+        self._wrote.set(True)
+        return await super().execute_many(query, values)
+
+    def transaction(self, **kwargs: Any) -> Transaction:
+        """
+        Start a transaction on the primary connection of the context.
+
+        Unlike `Database.transaction()` it never opens a new connection,
+        so the queries of the context run in the transaction.
+        """
+        return self.primary_connection().transaction(**kwargs)
+
+    def pool_stats(self) -> dict[str, Any] | None:
+        """Get the pool metrics of the primary and the replica."""
+        stats = super().pool_stats()
+        if stats is None or self.replica is None:
+            return stats
+        return {**stats, "replica": self.replica.pool_stats()}
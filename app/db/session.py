@@ -1,9 +1,34 @@
 """Connect to database."""
-from databases import Database
-from sqlalchemy import MetaData, create_engine
+import functools
+from typing import Any, Awaitable, Callable, TypeVar
+
+from sqlalchemy import MetaData
 
 from ..core.config import settings
+from .routing import RoutingDatabase
+
+T = TypeVar("T")
 
-database = Database(settings.SQLALCHEMY_DATABASE_URI)
+database = RoutingDatabase(
+    settings.SQLALCHEMY_DATABASE_URI,
+    replica_url=settings.REPLICA_DATABASE_URI,
+    min_size=settings.DB_POOL_MIN_SIZE,
+    max_size=settings.DB_POOL_MAX_SIZE,
+    acquire_timeout=settings.DB_POOL_ACQUIRE_TIMEOUT,
+    statement_timeout=settings.DB_STATEMENT_TIMEOUT,
+    connection_lifetime=settings.DB_CONNECTION_LIFETIME,
+)
 metadata = MetaData()
-engine = create_engine(settings.SQLALCHEMY_DATABASE_URI)
+
+
+def read_only(
+    func: Callable[..., Awaitable[T]]
+) -> Callable[..., Awaitable[T]]:
+    """Run the queries of the decorated coroutine on the read replica."""
+
+    @functools.wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> T:
+        with database.prefer_replica():
+            return await func(*args, **kwargs)
+
+    return wrapper
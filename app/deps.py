@@ -1,12 +1,16 @@
 """Dependencies."""
-from fastapi import Depends, Path
+from typing import Callable, Type
+
+from fastapi import Depends, Path, Query
 from fastapi.security import OAuth2PasswordBearer
+from pydantic import BaseModel
 
 from . import exceptions as exc
 from .core.config import settings
 from .core.security import decode_token
 from .crud.brand import CRUDBrand
 from .crud.user import CRUDUser
+from .db.session import database
 from .models.brand import Brand as BrandModel
 from .models.user import User as UserModel
 
@@ -16,6 +20,16 @@ reusable_oauth2 = OAuth2PasswordBearer(
 )
 
 
+async def use_primary() -> None:
+    """
+    Run all queries of the request on the primary.
+
+    For endpoints that write, so their lookups see the latest data
+    instead of a lagging replica.
+    """
+    database.use_primary()
+
+
 async def get_user_from_token(
     token: str | None = Depends(reusable_oauth2)
 ) -> UserModel | None:
@@ -25,7 +39,7 @@ async def get_user_from_token(
     token_data = decode_token(token=token)
     if token_data.type != "access_token":
         raise exc.UnauthenticatedError("Invalid token type")
-    user = await CRUDUser.get_by_email(email=token_data.sub)
+    user = await CRUDUser.get_by_email(email=token_data.sub, cached=True)
     if not user:
         raise exc.NotFoundError("User not found")
     return user
@@ -58,6 +72,14 @@ async def get_current_superuser_optional(
     return current_user
 
 
+async def check_metrics_access(
+    current_user: UserModel | None = Depends(get_current_superuser_optional),
+) -> None:
+    """Check if current user can read the metrics (superuser)."""
+    if not settings.METRICS_PUBLIC and current_user is None:
+        raise exc.UnauthenticatedError("Not authenticated")
+
+
 async def get_active_brand(
     brand_id: str = Path(..., description="The ID of the brand.")
 ) -> BrandModel | None:
@@ -68,3 +90,51 @@ async def get_active_brand(
     if not CRUDBrand.is_active(brand):
         return None
     return brand
+
+
+async def check_brand_access(
+    brand_id: str, current_user: UserModel | None
+) -> bool:
+    """
+    Check if current user can read the products of the brand.
+
+    Inactive brands are only readable by their owner.
+    Returns whether the brand is active.
+    """
+    brand = await CRUDBrand.get_by_id(brand_id=brand_id)
+    if brand is None:
+        raise exc.NotFoundError("Brand not found")
+    if CRUDBrand.is_active(brand):
+        return True
+    if current_user is None:
+        raise exc.UnauthorizedError(message="Inactive brand")
+    if not CRUDBrand.is_owner(brand, current_user):
+        raise exc.NotFoundError("Brand not found")
+    return False
+
+
+def get_fields(schema: Type[BaseModel]) -> Callable[..., list[str] | None]:
+    """Get a dependency that parses the `fields` query of the schema."""
+    allowed = list(schema.__fields__)
+
+    async def _get_fields(
+        fields: str | None = Query(
+            None,
+            description=(
+                "Comma separated fields to return, "
+                f"any of: {', '.join(allowed)}. Default to all fields."
+            )
+        )
+    ) -> list[str] | None:
+        """Get the selected fields."""
+        if not fields:
+            return None
+        selected = list(dict.fromkeys(
+            name.strip() for name in fields.split(",") if name.strip()))
+        unknown = set(selected) - set(allowed)
+        if unknown:
+            raise exc.FormatError(
+                f"Unknown fields: {', '.join(sorted(unknown))}")
+        return selected or None
+
+    return _get_fields
@@ -1,29 +1,116 @@
 """Router for brand."""
 from typing import Any
 
-from fastapi import APIRouter, Depends, Path
+from fastapi import APIRouter, Depends, Path, Query, Response
 
 from .. import exceptions as exc
+from ..core.cache import response_cache
+from ..core.http import dump_json
 from ..crud.brand import CRUDBrand
-from ..deps import (get_active_brand, get_current_user,
-                    get_current_user_optional)
-from ..models.brand import Brand as BrandModel
+from ..deps import (get_current_user, get_current_user_optional, get_fields,
+                    use_primary)
 from ..models.user import User as UserModel
-from ..schemas.brand import Brand, BrandCreate, BrandProduct, BrandUpdate
+from ..schemas.brand import (Brand, BrandBatch, BrandBatchItem, BrandCreate,
+                             BrandPage, BrandProduct, BrandSummary,
+                             BrandUpdate, Item)
 from ..schemas.message import Message
 
 router = APIRouter()
 
+BRAND_FIELDS = list(Brand.__fields__)
+BRAND_DETAIL_FIELDS = [
+    name for name in BrandProduct.__fields__ if name != "products"]
+ITEM_FIELDS = list(Item.__fields__)
+SUMMARY_FIELDS = list(BrandSummary.__fields__)
+BATCH_FIELDS = [
+    name for name in BrandBatchItem.__fields__ if name != "products"]
+MAX_BATCH_IDS = 100
+
 
 @router.get(
     "",
-    response_model=list[Brand]
+    response_model=BrandPage
 )
 async def get_brands(
+    limit: int = Query(50, ge=1, le=200, description="The page size."),
+    cursor: str | None = Query(
+        None, description="The `next_cursor` of the previous page."),
+    fields: list[str] | None = Depends(get_fields(Brand)),
     current_user: UserModel = Depends(get_current_user)
 ) -> Any:
-    """Get all brands that belong to current user."""
-    return await CRUDBrand.get_all(user_obj=current_user)
+    """
+    Get brands that belong to current user, newest first.
+
+    notes
+    - Pass `next_cursor` back as `cursor` to get the next page,
+      it is null on the last page.
+    - Pass `fields` to only read and return those fields of each brand.
+    - `product_count`, `max_discount_rate` and `products_updated_time`
+      summarize the products, they are stored on the brand.
+    """
+    brands, next_cursor = await CRUDBrand.get_all_values(
+        user_obj=current_user,
+        limit=limit,
+        cursor=cursor,
+        fields=fields or BRAND_FIELDS
+    )
+    return Response(
+        dump_json({"items": brands, "next_cursor": next_cursor}),
+        media_type="application/json"
+    )
+
+
+@router.get(
+    "/batch",
+    response_model=BrandBatch,
+    summary="Get Brands By Ids (login optional)",
+)
+async def get_brands_batch(
+    brand_id: list[str] = Query(
+        ..., description=f"The brand ids (repeatable, at most {MAX_BATCH_IDS})."),  # noqa: E501
+    products: bool = Query(
+        False, description="Include the products of each brand."),
+    fields: list[str] | None = Depends(get_fields(BrandBatchItem)),
+    current_user: UserModel | None = Depends(get_current_user_optional)
+) -> Any:
+    """
+    Get many brands at once, in the order of the ids.
+
+    notes
+    - Active brands are returned to everyone, inactive
+      brands only to their owner.
+    - Ids of unknown or hidden brands are listed in `not_found`.
+    - `products` is null unless `products=true`, all products
+      are read with one more query.
+    - Pass `fields` to only read and return those fields of each brand.
+    - Rows are dumped to JSON as read, without building models.
+    """
+    brand_ids = list(dict.fromkeys(brand_id))
+    if len(brand_ids) > MAX_BATCH_IDS:
+        raise exc.FormatError(f"At most {MAX_BATCH_IDS} brand ids")
+    fields = fields or [*BATCH_FIELDS, "products"]
+    brand_fields = [name for name in fields if name != "products"]
+    # the id tells which brands were found
+    brands = await CRUDBrand.get_many_values(
+        brand_ids=brand_ids,
+        user_obj=current_user,
+        fields=list(dict.fromkeys([*brand_fields, "id"])),
+        product_fields=(
+            ITEM_FIELDS if products and "products" in fields else None)
+    )
+    found = {str(brand["id"]) for brand in brands}
+    for brand in brands:
+        if "products" in fields:
+            brand.setdefault("products", None)
+        if "id" not in fields:
+            del brand["id"]
+    return Response(
+        dump_json({
+            "items": brands,
+            "not_found": [i for i in brand_ids if i not in found],
+        }),
+        media_type="application/json"
+    )
 
 
 @router.get(
@@ -33,8 +120,8 @@ async def get_brands(
 )
 async def get_brand(
     brand_id: str = Path(...),
-    current_user: UserModel | None = Depends(get_current_user_optional),
-    current_brand: BrandModel | None = Depends(get_active_brand)
+    fields: list[str] | None = Depends(get_fields(BrandProduct)),
+    current_user: UserModel | None = Depends(get_current_user_optional)
 ) -> Any:
     """
     Get all products of brand.
@@ -43,23 +130,83 @@ async def get_brand(
     - When the brand is not active, only user with
       an access token can access endpoint. It will
       also check if the brand belongs to current user.
+    - Pass `fields` to only read and return those fields of the
+      brand, the products are not read unless `products` is one.
+    - Responses of active brands are cached until the brand
+      or its products change.
+    - Rows are dumped to JSON as read, without building models.
     """
-    if current_brand:
-        return current_brand
-    if current_user is None:
-        raise exc.UnauthorizedError(message="Inactive brand")
-    if current_user and current_brand is None:
-        brand = await CRUDBrand.get_by_id(
-            brand_id=brand_id, user_obj=current_user)
-        if brand is None:
+    fields = fields or [*BRAND_DETAIL_FIELDS, "products"]
+    cache_name = f"detail:{','.join(fields)}"
+    body, generation = await response_cache.get(brand_id, cache_name)
+    if body is not None:
+        return Response(body, media_type="application/json")
+    brand_fields = [name for name in fields if name != "products"]
+    # is_active decides who can see the brand
+    detail = await CRUDBrand.get_values_by_id(
+        brand_id=brand_id,
+        fields=list(dict.fromkeys([*brand_fields, "is_active"])),
+        product_fields=ITEM_FIELDS if "products" in fields else None
+    )
+    if detail is None:
+        raise exc.NotFoundError("Brand not found")
+    brand, owner_id = detail
+    is_active = (
+        brand["is_active"] if "is_active" in fields
+        else brand.pop("is_active"))
+    if not is_active:
+        if current_user is None:
+            raise exc.UnauthorizedError(message="Inactive brand")
+        if owner_id != str(current_user.pk):
+            raise exc.NotFoundError("Brand not found")
+    body = dump_json(brand)
+    if is_active:
+        await response_cache.set(brand_id, cache_name, body, generation)
+    return Response(body, media_type="application/json")
+
+
+@router.get(
+    "/{brand_id}/summary",
+    response_model=BrandSummary,
+    summary="Get Brand Summary (login optional)",
+)
+async def get_brand_summary(
+    brand_id: str = Path(...),
+    current_user: UserModel | None = Depends(get_current_user_optional)
+) -> Any:
+    """
+    Get the product count, best discount and last product change of brand.
+
+    notes
+    - When the brand is not active, only its owner
+      can access endpoint.
+    - The summary is stored on the brand and updated with
+      its products, no products are read.
+    """
+    body, generation = await response_cache.get(brand_id, "summary")
+    if body is not None:
+        return Response(body, media_type="application/json")
+    detail = await CRUDBrand.get_values_by_id(
+        brand_id=brand_id, fields=SUMMARY_FIELDS)
+    if detail is None:
+        raise exc.NotFoundError("Brand not found")
+    summary, owner_id = detail
+    if not summary["is_active"]:
+        if current_user is None:
+            raise exc.UnauthorizedError(message="Inactive brand")
+        if owner_id != str(current_user.pk):
             raise exc.NotFoundError("Brand not found")
-        return brand
+    body = dump_json(summary)
+    if summary["is_active"]:
+        await response_cache.set(brand_id, "summary", body, generation)
+    return Response(body, media_type="application/json")
 
 
 @router.post(
     "",
     status_code=201,
-    response_model=Brand
+    response_model=Brand,
+    dependencies=[Depends(use_primary)],
 )
 async def create_brand(
     brand_in: BrandCreate,
@@ -82,16 +229,13 @@ async def create_brand(
     - Each brand must contain at least one contact info.
     - User can only edit their own brands.
     """
-    brand = await CRUDBrand.get_by_name(
-        name=brand_in.name, user_obj=current_user)
-    if brand:
-        raise exc.ConflictError("Brand already exists")
     return await CRUDBrand.create(user_obj=current_user, obj_in=brand_in)
 
 
 @router.patch(
     "/{brand_id}",
-    response_model=Brand
+    response_model=Brand,
+    dependencies=[Depends(use_primary)],
 )
 async def update_brand(
     brand_in: BrandUpdate,
@@ -122,6 +266,7 @@ async def update_brand(
 @router.delete(
     "/{brand_id}",
     response_model=Message,
+    dependencies=[Depends(use_primary)],
 )
 async def delete_brand(
     brand_id: str = Path(...),
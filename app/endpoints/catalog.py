@@ -0,0 +1,111 @@
+"""Router for the product catalog across brands."""
+from datetime import datetime
+from typing import Any
+
+from fastapi import APIRouter, Depends, Query, Response
+
+from ..core.http import dump_json
+from ..crud.product import CRUDProduct
+from ..deps import check_brand_access, get_current_user_optional
+from ..models.user import User as UserModel
+from ..schemas.product import CatalogPage, Product, ProductSearchPage
+
+router = APIRouter()
+
+PRODUCT_FIELDS = list(Product.__fields__)
+
+
+@router.get(
+    "",
+    response_model=CatalogPage,
+    summary="Get Catalog",
+)
+async def get_catalog(
+    min_discount: float | None = Query(
+        None, ge=0, le=1, description="The lowest discount rate."),
+    max_discount: float | None = Query(
+        None, ge=0, le=1, description="The highest discount rate."),
+    created_after: datetime | None = Query(
+        None, description="Only products created at or after this time."),
+    created_before: datetime | None = Query(
+        None, description="Only products created before this time."),
+    brand_id: list[str] | None = Query(
+        None, description="Only products of these brands (repeatable)."),
+    sort: str = Query(
+        "recent",
+        regex="^(recent|discount)$",
+        description="Newest first, or highest discount first."
+    ),
+    limit: int = Query(50, ge=1, le=200, description="The page size."),
+    cursor: str | None = Query(
+        None, description="The `next_cursor` of the previous page.")
+) -> Any:
+    """
+    Get products of all active brands.
+
+    notes
+    - Products of inactive brands are never listed.
+    - Pass `next_cursor` back as `cursor` with the same filters and
+      `sort` to get the next page, it is null on the last page.
+    """
+    products, next_cursor = await CRUDProduct.get_catalog(
+        min_discount=min_discount,
+        max_discount=max_discount,
+        created_after=created_after,
+        created_before=created_before,
+        brand_ids=brand_id,
+        sort=sort,
+        limit=limit,
+        cursor=cursor,
+        fields=PRODUCT_FIELDS
+    )
+    return Response(
+        dump_json({"items": products, "next_cursor": next_cursor}),
+        media_type="application/json"
+    )
+
+
+@router.get(
+    "/search",
+    response_model=ProductSearchPage,
+    summary="Search Products (login optional)",
+)
+async def search_products(
+    q: str = Query(
+        ..., min_length=1, max_length=256,
+        description=(
+            "Words to search for in title and description, "
+            'supports `"quoted phrases"`, `or` and `-excluded` words.'
+        )
+    ),
+    brand_id: str | None = Query(
+        None, description="Only search the products of this brand."),
+    limit: int = Query(20, ge=1, le=100, description="The page size."),
+    cursor: str | None = Query(
+        None, description="The `next_cursor` of the previous page."),
+    current_user: UserModel | None = Depends(get_current_user_optional)
+) -> Any:
+    """
+    Search products by title and description, best match first.
+
+    notes
+    - Titles weigh more than descriptions in the ranking.
+    - Without `brand_id` only products of active brands are
+      searched. When the brand of `brand_id` is not active, only
+      its owner can search it.
+    - Pass `next_cursor` back as `cursor` to get the next page,
+      it is null on the last page.
+    """
+    if brand_id:
+        await check_brand_access(brand_id, current_user)
+    products, next_cursor = await CRUDProduct.search(
+        q=q,
+        brand_id=brand_id,
+        limit=limit,
+        cursor=cursor,
+        fields=PRODUCT_FIELDS
+    )
+    return Response(
+        dump_json({"items": products, "next_cursor": next_cursor}),
+        media_type="application/json"
+    )
@@ -0,0 +1,52 @@
+"""Router for metrics."""
+from typing import Any
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+
+from ..core import metrics
+from ..db.session import database
+from ..deps import check_metrics_access
+
+router = APIRouter()
+
+
+@router.get(
+    "",
+    response_class=PlainTextResponse,
+    dependencies=[Depends(check_metrics_access)],
+)
+async def get_metrics() -> Any:
+    """
+    Get the request and query metrics in the Prometheus text format.
+
+    notes
+    - `http_request_duration_seconds` is the latency per route and
+      status, `http_request_db_queries` the SQL statements per request
+      of a route (a growing count points to an N+1 query).
+    - `db_slow_queries_total` counts the statements slower than
+      `DB_SLOW_QUERY_THRESHOLD` milliseconds, they are also logged.
+    - Kept per worker process.
+    - Only superusers can access endpoint, unless `METRICS_PUBLIC`.
+    """
+    return PlainTextResponse(
+        metrics.render(),
+        media_type="text/plain; version=0.0.4",
+    )
+
+
+@router.get("/pool", dependencies=[Depends(check_metrics_access)])
+async def get_pool_metrics() -> Any:
+    """
+    Get the database connection pool metrics.
+
+    notes
+    - `in_use`, `idle` and `waiting` are the current connection
+      counts, `waiting` above zero means the pool is exhausted.
+    - `acquires`, `timeouts` and `wait_seconds` are totals since
+      the worker started.
+    - The metrics of the read replica pool are under `replica`.
+    - Empty when the database has no connection pool (sqlite).
+    - Only superusers can access endpoint, unless `METRICS_PUBLIC`.
+    """
+    return database.pool_stats() or {}
@@ -1,54 +1,237 @@
 """Router for product."""
-from typing import Any
+import codecs
+import csv
+from itertools import islice
+from typing import Any, AsyncIterator, Iterable
 
-from fastapi import APIRouter, Depends, File, Path, Query, UploadFile
+from fastapi import (APIRouter, BackgroundTasks, Body, Depends, File, Header,
+                     Path, Query, Response, UploadFile)
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 
 from .. import exceptions as exc
+from ..core import imaging
+from ..core.cache import response_cache
+from ..core.config import settings
+from ..core.http import (dump_json, etag_matches, parse_range,
+                         stream_json_array, stream_ndjson)
 from ..crud.brand import CRUDBrand
 from ..crud.product import CRUDProduct
-from ..deps import (get_active_brand, get_current_user,
-                    get_current_user_optional)
+from ..deps import (check_brand_access, get_active_brand, get_current_user,
+                    get_current_user_optional, get_fields, use_primary)
 from ..models.brand import Brand as BrandModel
 from ..models.user import User as UserModel
 from ..schemas.message import Message
-from ..schemas.product import Product, ProductCreate, ProductUpdate
+from ..schemas.product import (Product, ProductBulkReport, ProductBulkUpdate,
+                               ProductCreate, ProductImportReport,
+                               ProductPage, ProductSelection, ProductUpdate)
+from ..storage.store import blob_store
 
 router = APIRouter()
 
+PRODUCT_FIELDS = list(Product.__fields__)
+
 
 @router.get(
     "/{brand_id}/products",
-    response_model=list[Product],
+    response_model=ProductPage,
     summary="Get Products (login optional)",
 )
 async def get_products(
     brand_id: str = Path(...),
+    limit: int = Query(50, ge=1, le=200, description="The page size."),
+    cursor: str | None = Query(
+        None, description="The `next_cursor` of the previous page."),
+    fields: list[str] | None = Depends(get_fields(Product)),
+    current_user: UserModel | None = Depends(get_current_user_optional)
+) -> Any:
+    """
+    Get products for that brand, newest first.
+
+    notes
+    - When the brand is not active, only user with
+      an access token can access endpoint.
+    - Pass `next_cursor` back as `cursor` to get the next page,
+      it is null on the last page.
+    - Pass `fields` to only read and return those fields of each
+      product, e.g. `id,title,discount_rate` for a list view.
+    - Responses of active brands are cached until the brand
+      or its products change, the access is checked first.
+    - Rows are dumped to JSON as read, without building models.
+    """
+    is_active = await check_brand_access(brand_id, current_user)
+    cache_name = f"products:{limit}:{cursor or ''}:{','.join(fields or [])}"
+    body, generation = await response_cache.get(brand_id, cache_name)
+    if body is not None:
+        return Response(body, media_type="application/json")
+    products, next_cursor = await CRUDProduct.get_all_values(
+        brand_id=brand_id,
+        limit=limit,
+        cursor=cursor,
+        fields=fields or PRODUCT_FIELDS
+    )
+    body = dump_json({"items": products, "next_cursor": next_cursor})
+    if is_active:
+        await response_cache.set(brand_id, cache_name, body, generation)
+    return Response(body, media_type="application/json")
+
+
+@router.get(
+    "/{brand_id}/products/export",
+    response_class=StreamingResponse,
+    summary="Export Products (login optional)",
+    responses={
+        200: {"content": {"application/x-ndjson": {}, "application/json": {}}},  # noqa: E501
+    },
+)
+async def export_products(
+    brand_id: str = Path(...),
+    export_format: str = Query(
+        "ndjson",
+        alias="format",
+        regex="^(ndjson|json)$",
+        description="One product per line, or a single JSON array."
+    ),
+    fields: list[str] | None = Depends(get_fields(Product)),
+    current_user: UserModel | None = Depends(get_current_user_optional)
+) -> Any:
+    """
+    Export all products of brand, newest first.
+
+    notes
+    - When the brand is not active, only user with
+      an access token can access endpoint.
+    - The products are read and sent in batches, so the
+      whole catalog is never held in memory.
+    - Pass `fields` to only export those fields of each product.
+    """
+    await check_brand_access(brand_id, current_user)
+    batches = CRUDProduct.iterate_values(
+        brand_id=brand_id,
+        fields=fields or PRODUCT_FIELDS,
+        batch_size=settings.EXPORT_BATCH_SIZE
+    )
+    if export_format == "ndjson":
+        content, media_type = stream_ndjson(batches), "application/x-ndjson"
+    else:
+        content, media_type = stream_json_array(batches), "application/json"
+    return StreamingResponse(
+        content,
+        media_type=media_type,
+        headers={
+            "Content-Disposition":
+                f'attachment; filename="products-{brand_id}.{export_format}"'
+        },
+    )
+
+
+@router.get(
+    "/{brand_id}/products/{product_id}/image",
+    response_class=StreamingResponse,
+    summary="Get Product Image (login optional)",
+    responses={
+        200: {"content": {"image/*": {}}},
+        206: {"description": "Partial Content"},
+        304: {"description": "Not Modified"},
+        416: {"description": "Range Not Satisfiable"},
+    },
+)
+async def get_product_image(
+    brand_id: str = Path(...),
+    product_id: str = Path(...),
+    variant: str = Query(
+        "original",
+        regex="^(original|thumbnail|medium)$",
+        description="The size of the image."
+    ),
+    if_none_match: str | None = Header(None),
+    if_range: str | None = Header(None),
+    range_header: str | None = Header(None, alias="range"),
     current_user: UserModel | None = Depends(get_current_user_optional),
     current_brand: BrandModel | None = Depends(get_active_brand)
 ) -> Any:
     """
-    Get all products for that brand.
+    Get the raw image of product.
 
     notes
     - When the brand is not active, only user with
       an access token can access endpoint.
+    - The `ETag` is the SHA-256 digest of the image, send it back
+      with `If-None-Match` to get `304 Not Modified`.
+    - Supports a single byte range with `Range` and `If-Range`.
+    - The `thumbnail` and `medium` variants are created in the
+      background after the product is created, they return 404
+      until they are ready.
     """
     if current_user is None and current_brand is None:
         raise exc.UnauthorizedError(message="Inactive brand")
     if current_user and current_brand is None:
-        brand = await CRUDBrand.get_by_id(
-            brand_id=brand_id, user_obj=current_user)
-        if brand is None:
+        if not await CRUDBrand.exists(
+                brand_id=brand_id, user_obj=current_user):
             raise exc.NotFoundError("Brand not found")
-    return await CRUDProduct.get_all(brand_id=brand_id)
+    product = await CRUDProduct.get_by_id(
+        product_id=product_id, brand_id=brand_id)
+    if product is None:
+        raise exc.NotFoundError("Product not found")
+    if variant == "original":
+        image_id = product.image_id
+        media_type = (
+            product.image_type if product.image_type in imaging.CONTENT_TYPES
+            else "application/octet-stream"
+        )
+    else:
+        image_id = getattr(product, f"image_{variant}_id")
+        media_type = imaging.variant_content_type()
+    size = await blob_store.size(image_id) if image_id else None
+    if size is None:
+        raise exc.NotFoundError("Image not found")
+
+    etag = f'"{image_id}"'
+    cache_control = (
+        f"public, max-age={settings.IMAGE_CACHE_MAX_AGE}"
+        if current_brand else "private, no-cache"
+    )
+    headers = {
+        "ETag": etag,
+        "Accept-Ranges": "bytes",
+        "Cache-Control": cache_control,
+        # never render the blob as a document
+        "X-Content-Type-Options": "nosniff",
+        "Content-Security-Policy": "sandbox",
+    }
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+
+    byte_range = None
+    if if_range is None or if_range == etag:
+        byte_range = parse_range(range_header, size)
+    if byte_range is None:
+        start, end, status_code = 0, size - 1, 200
+    else:
+        (start, end), status_code = byte_range, 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(
+        blob_store.stream(
+            image_id,
+            start=start,
+            end=end,
+            chunk_size=settings.IMAGE_CHUNK_SIZE
+        ),
+        status_code=status_code,
+        media_type=media_type,
+        headers=headers,
+    )
 
 
 @router.post(
     "/{brand_id}/products",
     status_code=201,
-    response_model=Product
+    response_model=Product,
+    dependencies=[Depends(use_primary)],
 )
 async def create_product(
+    background_tasks: BackgroundTasks,
     brand_id: str = Path(...),
     current_user: UserModel = Depends(get_current_user),
     item: ProductCreate = Depends(ProductCreate.as_form),
@@ -64,7 +247,11 @@ async def create_product(
 
     optional
     - **description**: description of product
-    - **image**: image of product, it will convert image to base64
+    - **image**: image of product (PNG, JPEG, GIF or WEBP), it will
+                 be saved to the blob store and referenced by its
+                 SHA-256 digest (`image_id`), a thumbnail and a medium
+                 variant are created in the background
+                 (`image_thumbnail_id`, `image_medium_id`)
 
     notes
     - User can only edit their own products.
@@ -73,16 +260,142 @@ async def create_product(
         brand_id=brand_id, user_obj=current_user)
     if brand is None:
         raise exc.NotFoundError("Brand not found")
-    product = await CRUDProduct.get_by_title(
-        title=item.title, brand_obj=brand)
-    if product:
-        raise exc.ConflictError("Product already exists")
-    return await CRUDProduct.create(brand_obj=brand, img_obj=image, obj_in=item)  # noqa: E501
+    product = await CRUDProduct.create(
+        brand_obj=brand, img_obj=image, obj_in=item)
+    if product.image_id:
+        background_tasks.add_task(
+            CRUDProduct.create_image_variants, product_obj=product)
+    return product
+
+
+@router.post(
+    "/{brand_id}/products/import",
+    response_model=ProductImportReport,
+    dependencies=[Depends(use_primary)],
+)
+async def import_products(
+    items: list[dict[str, Any]] = Body(...),
+    brand_id: str = Path(...),
+    current_user: UserModel = Depends(get_current_user)
+) -> Any:
+    """
+    ## Add products in bulk from a JSON array
+
+    Each item takes the same fields as adding a single product
+    (**title**, **discount_rate**, **description**), without image.
+
+    notes
+    - User can only edit their own products.
+    - Rows that are invalid or whose title already exists are
+      skipped, the report has a result for each row (from 1).
+    """
+    if not await CRUDBrand.exists(brand_id=brand_id, user_obj=current_user):
+        raise exc.NotFoundError("Brand not found")
+    return await _import_products(
+        brand_id, _batches(enumerate(items, 1), settings.IMPORT_BATCH_SIZE))
+
+
+@router.post(
+    "/{brand_id}/products/import/csv",
+    response_model=ProductImportReport,
+    dependencies=[Depends(use_primary)],
+)
+async def import_products_csv(
+    brand_id: str = Path(...),
+    current_user: UserModel = Depends(get_current_user),
+    file: UploadFile = File(...)
+) -> Any:
+    """
+    ## Add products in bulk from a CSV file
+
+    The file must be UTF-8 encoded with a header row, the columns
+    are **title**, **discount_rate** and **description**.
+
+    notes
+    - User can only edit their own products.
+    - Rows that are invalid or whose title already exists are
+      skipped, the report has a result for each data row (from 1).
+    - The file is read and validated in batches.
+    """
+    if not await CRUDBrand.exists(brand_id=brand_id, user_obj=current_user):
+        raise exc.NotFoundError("Brand not found")
+    return await _import_products(
+        brand_id, _read_csv(file, settings.IMPORT_BATCH_SIZE))
+
+
+@router.patch(
+    "/{brand_id}/products/bulk",
+    response_model=ProductBulkReport,
+    dependencies=[Depends(use_primary)],
+)
+async def bulk_update_products(
+    item: ProductBulkUpdate,
+    brand_id: str = Path(...),
+    current_user: UserModel = Depends(get_current_user)
+) -> Any:
+    """
+    ## Update products in bulk
+
+    required
+    - **ids** or **titles**: the products to update
+    - **changes**: the same fields as updating a single product,
+                   applied to every selected product
+
+    notes
+    - User can only edit their own products.
+    - All products are updated in one transaction, the report has
+      the number of updated products and a status for each id and
+      title (`updated` or `not_found`).
+    """
+    if not await CRUDBrand.exists(brand_id=brand_id, user_obj=current_user):
+        raise exc.NotFoundError("Brand not found")
+    count, results = await CRUDProduct.bulk_update(
+        brand_id=brand_id,
+        ids=[str(product_id) for product_id in item.ids],
+        titles=item.titles,
+        obj_in=item.changes,
+        batch_size=settings.BULK_BATCH_SIZE
+    )
+    return {"count": count, "results": results}
+
+
+@router.delete(
+    "/{brand_id}/products/bulk",
+    response_model=ProductBulkReport,
+    dependencies=[Depends(use_primary)],
+)
+async def bulk_delete_products(
+    item: ProductSelection,
+    brand_id: str = Path(...),
+    current_user: UserModel = Depends(get_current_user)
+) -> Any:
+    """
+    ## Delete products in bulk
+
+    required
+    - **ids** or **titles**: the products to delete
+
+    notes
+    - User can only delete their own products.
+    - All products are deleted in one transaction, the report has
+      the number of deleted products and a status for each id and
+      title (`deleted` or `not_found`).
+    """
+    if not await CRUDBrand.exists(brand_id=brand_id, user_obj=current_user):
+        raise exc.NotFoundError("Brand not found")
+    count, results = await CRUDProduct.bulk_remove(
+        brand_id=brand_id,
+        ids=[str(product_id) for product_id in item.ids],
+        titles=item.titles,
+        batch_size=settings.BULK_BATCH_SIZE
+    )
+    return {"count": count, "results": results}
 
 
 @router.patch(
     "/{brand_id}/products",
-    response_model=Product
+    response_model=Product,
+    dependencies=[Depends(use_primary)],
 )
 async def update_product(
     item: ProductUpdate,
@@ -105,12 +418,10 @@ async def update_product(
     notes
     - User can only edit their own products.
     """
-    brand = await CRUDBrand.get_by_id(
-        brand_id=brand_id, user_obj=current_user)
-    if brand is None:
+    if not await CRUDBrand.exists(brand_id=brand_id, user_obj=current_user):
         raise exc.NotFoundError("Brand not found")
     product = await CRUDProduct.get_by_title(
-        title=title, brand_obj=brand)
+        title=title, brand_id=brand_id)
     if product is None:
         raise exc.NotFoundError("Product not found")
     return await CRUDProduct.update(
@@ -120,6 +431,7 @@ async def update_product(
 @router.delete(
     "/{brand_id}/products",
     response_model=Message,
+    dependencies=[Depends(use_primary)],
 )
 async def delete_product(
     brand_id: str = Path(...),
@@ -132,13 +444,58 @@ async def delete_product(
     notes
     - User can only delete their own products.
     """
-    brand = await CRUDBrand.get_by_id(
-        brand_id=brand_id, user_obj=current_user)
-    if brand is None:
+    if not await CRUDBrand.exists(brand_id=brand_id, user_obj=current_user):
         raise exc.NotFoundError("Brand not found")
     product = await CRUDProduct.get_by_title(
-        title=title, brand_obj=brand)
+        title=title, brand_id=brand_id)
     if product is None:
         raise exc.NotFoundError("Product not found")
     removed_product = await CRUDProduct.remove(product_obj=product)
     return Message(message=f"Deleted product: {removed_product.title}")
+
+
+async def _import_products(
+    brand_id: str, batches: AsyncIterator[list[tuple[int, dict[str, Any]]]]
+) -> dict[str, Any]:
+    """Create the products and summarize the results."""
+    results = await CRUDProduct.bulk_create(
+        brand_id=brand_id, batches=batches)
+    created = sum(result["status"] == "created" for result in results)
+    return {
+        "created": created,
+        "failed": len(results) - created,
+        "results": results,
+    }
+
+
+async def _batches(
+    rows: Iterable[tuple[int, dict[str, Any]]], batch_size: int
+) -> AsyncIterator[list[tuple[int, dict[str, Any]]]]:
+    """Split the numbered rows into batches."""
+    rows = iter(rows)
+    while batch := list(islice(rows, batch_size)):
+        yield batch
+
+
+async def _read_csv(
+    file: UploadFile, batch_size: int
+) -> AsyncIterator[list[tuple[int, dict[str, Any]]]]:
+    """Read the numbered rows of the uploaded CSV file in batches."""
+    reader = csv.DictReader(codecs.getreader("utf-8-sig")(file.file))
+    rows = enumerate(reader, 1)
+    while True:
+        try:
+            batch = await run_in_threadpool(
+                lambda: list(islice(rows, batch_size)))
+        except (UnicodeDecodeError, csv.Error):
+            raise exc.FormatError("Invalid CSV file")
+        if not batch:
+            return
+        # empty cells are missing values, extra cells are dropped
+        yield [
+            (row, {
+                key: value or None
+                for key, value in data.items() if key is not None
+            })
+            for row, data in batch
+        ]
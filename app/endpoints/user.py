@@ -3,7 +3,6 @@ from typing import Any
 
 from fastapi import APIRouter, Depends
 
-from .. import exceptions as exc
 from ..crud.user import CRUDUser
 from ..deps import get_current_superuser_optional
 from ..models.user import User as UserModel
@@ -37,9 +36,6 @@ async def create_user(
     notes
     - `is_active` and `is_superuser` only can be used by `admin`
     """
-    user = await CRUDUser.get_by_email(email=user_in.email)
-    if user:
-        raise exc.ConflictError("Email already registered")
     if not current_user:
         user_in = user_in.dict(exclude={"is_active", "is_superuser"})
     return await CRUDUser.create(obj_in=user_in)
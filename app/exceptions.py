@@ -11,6 +11,8 @@ from app.main import app
 class CustomError(Exception):
     """Custom error."""
 
+    headers: dict[str, str] | None = None
+
     def __init__(self, status_code: int, message: Any):
         """Initialize."""
         self.status_code = status_code
@@ -62,12 +64,51 @@ class FormatError(CustomError):
         self.message = message
 
 
+class PayloadTooLargeError(CustomError):
+    """Payload too large error."""
+
+    def __init__(self, message):
+        """Initialize."""
+        self.status_code = 413
+        self.message = message
+
+
+class UnsupportedMediaTypeError(CustomError):
+    """Unsupported media type error."""
+
+    def __init__(self, message):
+        """Initialize."""
+        self.status_code = 415
+        self.message = message
+
+
+class RangeNotSatisfiableError(CustomError):
+    """Requested range not satisfiable error."""
+
+    def __init__(self, message, size: int):
+        """Initialize."""
+        self.status_code = 416
+        self.message = message
+        self.headers = {"Content-Range": f"bytes */{size}"}
+
+
+class ServiceUnavailableError(CustomError):
+    """Service temporarily unavailable error."""
+
+    def __init__(self, message, retry_after: int = 1):
+        """Initialize."""
+        self.status_code = 503
+        self.message = message
+        self.headers = {"Retry-After": str(retry_after)}
+
+
 @app.exception_handler(CustomError)
 async def custom_error_handler(request: Request, exc: CustomError):
     """Handle custom error."""
     return JSONResponse(
         status_code=exc.status_code,
         content={"message": exc.message},
+        headers=exc.headers,
     )
 
 
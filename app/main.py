@@ -1,11 +1,15 @@
 """Main app."""
 from fastapi import FastAPI
 
+from .core import executors
+from .core.cache import response_cache
 from .core.config import settings
+from .core.middleware import TimingMiddleware
 from .db.session import database
-from .endpoints import auth, brand, index, product, user
+from .endpoints import auth, brand, catalog, index, metrics, product, user
 
 app = FastAPI()
+app.add_middleware(TimingMiddleware)
 
 
 @app.on_event("startup")
@@ -18,10 +22,14 @@ async def startup():
 async def shutdown():
     if database.is_connected:
         await database.disconnect()
+    executors.shutdown()
+    await response_cache.close()
 
 
 app.include_router(index.router)
+app.include_router(metrics.router, prefix="/metrics", tags=["metrics"])
 app.include_router(user.router, prefix=f"{settings.API_PREFIX}/users", tags=["users"])  # noqa: E501
 app.include_router(auth.router, prefix=f"{settings.API_PREFIX}/auth", tags=["auth"])  # noqa: E501
 app.include_router(brand.router, prefix=f"{settings.API_PREFIX}/brands", tags=["brands"])  # noqa: E501
+app.include_router(catalog.router, prefix=f"{settings.API_PREFIX}/products", tags=["products"])  # noqa: E501
 app.include_router(product.router, prefix=f"{settings.API_PREFIX}", tags=["products"])  # noqa: E501
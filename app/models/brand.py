@@ -14,7 +14,19 @@ class Brand(ormar.Model):
 
     class Meta(BaseMeta):
         tablename = "brand"
-        constraints = [ormar.UniqueColumns("owner", "name")]
+        constraints = [
+            ormar.UniqueColumns("owner", "name"),
+            ormar.IndexColumns(
+                "owner", "created_time", "id",
+                name="ix_brand_owner_created_time_id"
+            ),
+            # the catalog only joins active brands
+            ormar.IndexColumns(
+                "id",
+                name="ix_brand_active_id",
+                postgresql_where=expression.text("is_active")
+            ),
+        ]
 
     id: str = ormar.UUID(
         primary_key=True,
@@ -34,6 +46,14 @@ class Brand(ormar.Model):
         server_default=expression.true(),
         default=True
     )
+    # summary of the products, kept up to date by `CRUDProduct`
+    product_count: int = ormar.Integer(
+        server_default="0",
+        default=0,
+        nullable=False
+    )
+    max_discount_rate: float = ormar.Float(nullable=True)
+    products_updated_time: datetime = ormar.DateTime(nullable=True)
     owner: User = ormar.ForeignKey(
         User,
         related_name="brands",
@@ -13,7 +13,26 @@ class Product(ormar.Model):
 
     class Meta(BaseMeta):
         tablename = "product"
-        constraints = [ormar.UniqueColumns("brand", "title")]
+        constraints = [
+            ormar.UniqueColumns("brand", "title"),
+            ormar.IndexColumns(
+                "brand", "created_time", "id",
+                name="ix_product_brand_created_time_id"
+            ),
+            ormar.IndexColumns(
+                "created_time", "id",
+                name="ix_product_created_time_id"
+            ),
+            # the max discount of a brand is read from the index
+            ormar.IndexColumns(
+                "brand", "discount_rate",
+                name="ix_product_brand_discount_rate"
+            ),
+            ormar.IndexColumns(
+                "discount_rate", "created_time", "id",
+                name="ix_product_discount_rate_created_time_id"
+            ),
+        ]
 
     id: str = ormar.UUID(
         primary_key=True,
@@ -25,11 +44,10 @@ class Product(ormar.Model):
     title: str = ormar.String(max_length=128, nullable=False)
     description: str = ormar.Text(nullable=True)
     discount_rate: int = ormar.Float(minimum=0, maximum=1, nullable=False)
-    image: str = ormar.LargeBinary(
-        nullable=True,
-        max_length=20000000,
-        represent_as_base64_str=True
-    )
+    image_id: str = ormar.String(max_length=64, nullable=True)
+    image_type: str = ormar.String(max_length=128, nullable=True)
+    image_thumbnail_id: str = ormar.String(max_length=64, nullable=True)
+    image_medium_id: str = ormar.String(max_length=64, nullable=True)
     created_time: datetime = ormar.DateTime(default=datetime.now)
     brand: Brand = ormar.ForeignKey(
         Brand,
@@ -1,4 +1,5 @@
 """Schema for Brand."""
+from datetime import datetime
 from typing import Any
 from uuid import UUID
 
@@ -36,18 +37,61 @@ class BrandUpdate(BrandBase):
 class Brand(BrandCreate):
     """Output."""
     id: UUID
+    product_count: int = 0
+    max_discount_rate: float | None = None
+    products_updated_time: datetime | None = None
 
     class Config:
         orm_mode = True
 
 
+class BrandPage(BaseModel):
+    """Output (paginated)."""
+    items: list[Brand]
+    next_cursor: str | None
+
+
+class BrandSummary(BaseModel):
+    """Output (product summary)."""
+    id: UUID
+    name: str
+    is_active: bool
+    product_count: int
+    max_discount_rate: float | None
+    products_updated_time: datetime | None
+
+
 class Item(BaseModel):
     """Product item."""
     id: UUID
     title: str
     description: str | None
     discount_rate: float
-    image: str | None
+    image_id: str | None
+    image_thumbnail_id: str | None
+    image_medium_id: str | None
+
+
+class BrandBatchItem(BaseModel):
+    """Output of a brand in a batch (products only when asked)."""
+    id: UUID
+    name: str
+    about: str | None
+    social_media: str | None
+    website: str | None
+    email: str | None
+    phone: str | None
+    is_active: bool
+    product_count: int
+    max_discount_rate: float | None
+    products_updated_time: datetime | None
+    products: list[Item] | None
+
+
+class BrandBatch(BaseModel):
+    """Output (batch of brands)."""
+    items: list[BrandBatchItem]
+    not_found: list[str]
 
 
 class BrandProduct(BaseModel):
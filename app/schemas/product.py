@@ -1,8 +1,10 @@
 """Schema for Product."""
+from typing import Any
 from uuid import UUID
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, root_validator
 
+from .. import exceptions as exc
 from ..schemas.utils import as_form
 
 
@@ -26,7 +28,82 @@ class ProductUpdate(ProductBase):
 class Product(ProductCreate):
     """Output."""
     id: UUID
-    image: str | None
+    image_id: str | None
+    image_thumbnail_id: str | None
+    image_medium_id: str | None
 
     class Config:
         orm_mode = True
+
+
+class ProductPage(BaseModel):
+    """Output (paginated)."""
+    items: list[Product]
+    next_cursor: str | None
+
+
+class CatalogProduct(Product):
+    """Output (a product of the catalog)."""
+    brand_id: UUID
+
+
+class CatalogPage(BaseModel):
+    """Output (paginated catalog)."""
+    items: list[CatalogProduct]
+    next_cursor: str | None
+
+
+class ProductSearchResult(CatalogProduct):
+    """Output (a search result)."""
+    rank: float
+
+
+class ProductSearchPage(BaseModel):
+    """Output (paginated search results)."""
+    items: list[ProductSearchResult]
+    next_cursor: str | None
+
+
+class ProductImportResult(BaseModel):
+    """Output (a row of the import)."""
+    row: int
+    status: str = Field(..., description="created, invalid or conflict")
+    id: UUID | None = None
+    errors: list[str] | None = None
+
+
+class ProductImportReport(BaseModel):
+    """Output (import report)."""
+    created: int
+    failed: int
+    results: list[ProductImportResult]
+
+
+class ProductSelection(BaseModel):
+    """Bulk input (products to select by id or title)."""
+    ids: list[UUID] = []
+    titles: list[str] = []
+
+    @root_validator(skip_on_failure=True)
+    def check_selection(cls, values: dict[str, Any]):
+        if values.get("ids") or values.get("titles"):
+            return values
+        raise exc.FormatError("must contain at least one id or title")
+
+
+class ProductBulkUpdate(ProductSelection):
+    """Bulk update input."""
+    changes: ProductUpdate
+
+
+class ProductBulkResult(BaseModel):
+    """Output (an item of the bulk operation)."""
+    id: UUID | None = None
+    title: str | None = None
+    status: str = Field(..., description="updated, deleted or not_found")
+
+
+class ProductBulkReport(BaseModel):
+    """Output (bulk operation report)."""
+    count: int = Field(..., description="The number of affected products.")
+    results: list[ProductBulkResult]
@@ -12,3 +12,7 @@ class TokenPayload(BaseModel):
     """Token payload."""
     sub: str
     type: str
+
+    class Config:
+        # shared between requests by the token cache
+        allow_mutation = False
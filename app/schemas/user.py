@@ -17,6 +17,14 @@ class UserCreate(UserBase):
     password: str = Field(..., min_length=6)
 
 
+class UserUpdate(BaseModel):
+    """Update input."""
+    name: str = Field(None, max_length=32)
+    password: str = Field(None, min_length=6)
+    is_active: bool | None = None
+    is_superuser: bool | None = None
+
+
 class User(UserBase):
     """Output."""
     id: UUID
@@ -0,0 +1,67 @@
+"""Blob store interface."""
+import hashlib
+from abc import ABC, abstractmethod
+from typing import AsyncIterator
+
+
+class BlobStore(ABC):
+    """
+    Content-addressed storage for binary objects.
+
+    Blobs are keyed by the hex SHA-256 digest of their content, so
+    uploading the same bytes twice stores them only once. Because a
+    blob may be shared by several rows, callers never delete a blob
+    when a row referencing it goes away.
+    """
+
+    @staticmethod
+    def key_for(data: bytes) -> str:
+        """Get the key of the content."""
+        return hashlib.sha256(data).hexdigest()
+
+    @abstractmethod
+    async def put(self, data: bytes) -> str:
+        """Store the content and return its key."""
+
+    @abstractmethod
+    async def put_stream(
+        self, chunks: AsyncIterator[bytes], max_size: int | None = None
+    ) -> str:
+        """
+        Store the content from chunks and return its key.
+
+        The content is hashed while it is written, so it is never held
+        in memory as a whole. Raise `PayloadTooLargeError` as soon as
+        more than `max_size` bytes are received.
+        """
+
+    @abstractmethod
+    async def get(self, key: str) -> bytes | None:
+        """Get the content by key."""
+
+    @abstractmethod
+    def stream(
+        self,
+        key: str,
+        start: int = 0,
+        end: int | None = None,
+        chunk_size: int = 64 * 1024
+    ) -> AsyncIterator[bytes]:
+        """
+        Stream the content by key in chunks.
+
+        `start` and `end` are inclusive byte offsets, the same as
+        an HTTP `Range` header.
+        """
+
+    @abstractmethod
+    async def size(self, key: str) -> int | None:
+        """Get the content size by key."""
+
+    @abstractmethod
+    async def exists(self, key: str) -> bool:
+        """Check if the key is stored."""
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        """Delete the content by key."""
@@ -0,0 +1,159 @@
+"""Blob store backed by the local filesystem."""
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import IO, AsyncIterator, Iterator
+
+from fastapi.concurrency import iterate_in_threadpool, run_in_threadpool
+
+from .. import exceptions as exc
+from .base import BlobStore
+
+
+class LocalBlobStore(BlobStore):
+    """
+    Store blobs as files under a root directory.
+
+    Files are sharded by the first two bytes of the key
+    (`ab/cd/abcd...`) to keep directories small.
+    """
+
+    def __init__(self, root: str):
+        """Initialize."""
+        self.root = Path(root)
+
+    def path_for(self, key: str) -> Path:
+        """Get the file path of the key."""
+        return self.root / key[:2] / key[2:4] / key
+
+    async def put(self, data: bytes) -> str:
+        """Store the content and return its key."""
+        key = self.key_for(data)
+        await run_in_threadpool(self._write, key, data)
+        return key
+
+    async def put_stream(
+        self, chunks: AsyncIterator[bytes], max_size: int | None = None
+    ) -> str:
+        """Store the content from chunks and return its key."""
+        hasher = hashlib.sha256()
+        size = 0
+        f = await run_in_threadpool(self._open_temp)
+        try:
+            async for chunk in chunks:
+                size += len(chunk)
+                if max_size is not None and size > max_size:
+                    raise exc.PayloadTooLargeError(
+                        f"File exceeds the size limit of {max_size} bytes")
+                await run_in_threadpool(self._write_chunk, f, hasher, chunk)
+            await run_in_threadpool(f.close)
+            key = hasher.hexdigest()
+            await run_in_threadpool(self._commit_temp, f.name, key)
+        except BaseException:
+            await run_in_threadpool(self._discard_temp, f)
+            raise
+        return key
+
+    async def get(self, key: str) -> bytes | None:
+        """Get the content by key."""
+        return await run_in_threadpool(self._read, key)
+
+    def stream(
+        self,
+        key: str,
+        start: int = 0,
+        end: int | None = None,
+        chunk_size: int = 64 * 1024
+    ) -> AsyncIterator[bytes]:
+        """Stream the content by key in chunks."""
+        return iterate_in_threadpool(
+            self._iter_file(key, start, end, chunk_size))
+
+    async def size(self, key: str) -> int | None:
+        """Get the content size by key."""
+        return await run_in_threadpool(self._size, key)
+
+    async def exists(self, key: str) -> bool:
+        """Check if the key is stored."""
+        return await run_in_threadpool(self.path_for(key).is_file)
+
+    async def delete(self, key: str) -> None:
+        """Delete the content by key."""
+        await run_in_threadpool(self.path_for(key).unlink, missing_ok=True)
+
+    def _write(self, key: str, data: bytes) -> None:
+        """Write the content to the file of the key."""
+        path = self.path_for(key)
+        if path.is_file():
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # write to a temp file first, so readers never see a partial blob
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def _open_temp(self) -> IO[bytes]:
+        """Open a temp file under the root for an incoming blob."""
+        tmp_dir = self.root / "tmp"
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+        return tempfile.NamedTemporaryFile(dir=tmp_dir, delete=False)
+
+    @staticmethod
+    def _write_chunk(f: IO[bytes], hasher, chunk: bytes) -> None:
+        """Write a chunk to the temp file and update the digest."""
+        hasher.update(chunk)
+        f.write(chunk)
+
+    def _commit_temp(self, tmp_path: str, key: str) -> None:
+        """Move the temp file to the path of the key."""
+        path = self.path_for(key)
+        if path.is_file():
+            os.unlink(tmp_path)
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _discard_temp(f: IO[bytes]) -> None:
+        """Close and remove the temp file."""
+        f.close()
+        try:
+            os.unlink(f.name)
+        except FileNotFoundError:
+            pass
+
+    def _read(self, key: str) -> bytes | None:
+        """Read the content from the file of the key."""
+        try:
+            return self.path_for(key).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def _size(self, key: str) -> int | None:
+        """Get the size of the file of the key."""
+        try:
+            return self.path_for(key).stat().st_size
+        except FileNotFoundError:
+            return None
+
+    def _iter_file(
+        self, key: str, start: int, end: int | None, chunk_size: int
+    ) -> Iterator[bytes]:
+        """Read the file of the key from `start` to `end` in chunks."""
+        with self.path_for(key).open("rb") as f:
+            f.seek(start)
+            remaining = None if end is None else end - start + 1
+            while remaining is None or remaining > 0:
+                size = chunk_size if remaining is None else min(chunk_size, remaining)  # noqa: E501
+                chunk = f.read(size)
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
@@ -0,0 +1,14 @@
+"""Blob store instance."""
+from ..core.config import settings
+from .base import BlobStore
+from .local import LocalBlobStore
+
+
+def create_blob_store(backend: str) -> BlobStore:
+    """Create the blob store for the backend."""
+    if backend == "local":
+        return LocalBlobStore(root=settings.BLOB_STORE_ROOT)
+    raise ValueError(f"Unknown blob store backend: {backend}")
+
+
+blob_store = create_blob_store(settings.BLOB_STORE_BACKEND)
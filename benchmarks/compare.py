@@ -0,0 +1,73 @@
+"""
+Compare two load test results.
+
+Print the change of every scenario of `benchmarks.load` between a base
+and a head result file. Exit with status 1 when a scenario regressed:
+p95 or p99 latency grew, or req/s dropped, by more than `--threshold`,
+or the head has errors the base did not have.
+
+Usage:
+    $ python -m benchmarks.compare base.json head.json --threshold 0.1
+"""
+import argparse
+import json
+import sys
+from typing import Any
+
+# metric -> whether higher is better
+METRICS = {"p50_ms": False, "p95_ms": False, "p99_ms": False, "rps": True}
+GATED = ("p95_ms", "p99_ms", "rps")
+
+
+def load(path: str) -> dict[str, Any]:
+    """Read a result file."""
+    with open(path) as file:
+        return json.load(file)
+
+
+def change(base: float, head: float) -> float:
+    """Get the relative change from base to head."""
+    return (head - base) / base if base else 0.0
+
+
+def compare(
+    base: dict[str, Any], head: dict[str, Any], threshold: float
+) -> list[str]:
+    """Print the changes, get the regressed scenarios."""
+    regressions = []
+    print(f"base {base.get('commit')} head {head.get('commit')}")
+    print(f"{'scenario':>16} {'metric':>7} {'base':>10} {'head':>10} {'change':>8}")  # noqa: E501
+    for name, head_result in head["scenarios"].items():
+        base_result = base["scenarios"].get(name)
+        if base_result is None:
+            print(f"{name:>16} (new)")
+            continue
+        regressed = head_result["errors"] > base_result["errors"]
+        for metric, higher_is_better in METRICS.items():
+            delta = change(base_result[metric], head_result[metric])
+            worse = -delta if higher_is_better else delta
+            flag = ""
+            if metric in GATED and worse > threshold:
+                regressed = True
+                flag = " !"
+            print(
+                f"{name:>16} {metric:>7} {base_result[metric]:>10.2f} "
+                f"{head_result[metric]:>10.2f} {delta:>+8.1%}{flag}"
+            )
+        if regressed:
+            regressions.append(name)
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("base")
+    parser.add_argument("head")
+    parser.add_argument(
+        "--threshold", type=float, default=0.1,
+        help="The allowed relative change, default 10%%.")
+    args = parser.parse_args()
+    regressions = compare(load(args.base), load(args.head), args.threshold)
+    if regressions:
+        print(f"regressed: {', '.join(regressions)}")
+        sys.exit(1)
@@ -0,0 +1,358 @@
+"""
+Load test the hot paths of the API.
+
+Seed a deterministic data set into the configured database, run every
+scenario with concurrent clients and write p50/p95/p99 latency, req/s
+and peak RSS per scenario to a JSON file. Compare two result files with
+`benchmarks.compare`.
+
+Scenarios:
+    login               POST /api/auth/access-token
+    brand_read          GET /api/brands/{brand_id} (anonymous)
+    products_<size>     GET /api/{brand_id}/products (anonymous), walks
+                        the pages of a brand with <size> products
+    image_upload        POST /api/{brand_id}/products with an image
+    product_patch       PATCH /api/{brand_id}/products
+
+The app runs in process unless `--url` points to a running server, pass
+`--server-pid` to read the peak RSS of that server (Linux only).
+
+Requires `httpx` and a migrated database (`alembic upgrade head`).
+
+Usage:
+    $ python -m benchmarks.load --output results.json
+    $ python -m benchmarks.load --url http://localhost:8000 \\
+        --server-pid 1234 --sizes 10 1000 50000 --output results.json
+"""
+import argparse
+import asyncio
+import json
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from itertools import count
+from typing import Any, Awaitable, Callable
+from uuid import UUID
+
+import httpx
+
+from app.core.config import settings
+from app.core.security import create_access_token, get_password_hash
+from app.db.session import database
+from app.models.brand import Brand as BrandModel
+from app.models.product import Product as ProductModel
+from app.models.user import User as UserModel
+
+from .seed import random_png, refresh_summaries
+
+BATCH_SIZE = 1000
+# seconds to wait for the pool to close
+DISCONNECT_TIMEOUT = 10
+PASSWORD = "load-test-password"
+EPOCH = datetime(2022, 1, 1)
+
+# sends a request of a scenario, gets the client and the worker number
+Request = Callable[[httpx.AsyncClient, int], Awaitable[httpx.Response]]
+
+
+class DataSet:
+    """
+    Rows generated from a fixed seed.
+
+    The same seed gives the same ids, titles and timestamps, so every
+    run reads the same pages.
+    """
+
+    def __init__(self, seed: int):
+        """Initialize."""
+        self.rng = random.Random(seed)
+        self.email = f"load-{seed}@example.com"
+
+    def uuid(self) -> UUID:
+        """Get the next id."""
+        return UUID(int=self.rng.getrandbits(128), version=4)
+
+    def brand(self, owner_id: UUID, name: str) -> dict[str, Any]:
+        """Get the row of a brand."""
+        return {
+            "id": self.uuid(),
+            "name": name,
+            "about": f"About {name}",
+            "email": "load@example.com",
+            "created_time": EPOCH,
+            "is_active": True,
+            "product_count": 0,
+            "owner": owner_id,
+        }
+
+    def products(self, brand_id: UUID, size: int) -> Any:
+        """Generate the rows of the products of a brand."""
+        for i in range(size):
+            yield {
+                "id": self.uuid(),
+                "title": f"product-{i}",
+                "description": f"Description of product {i}",
+                "discount_rate": round(self.rng.random(), 2),
+                "created_time": EPOCH + timedelta(seconds=i),
+                "brand": brand_id,
+            }
+
+    def image(self) -> bytes:
+        """Get a PNG of random pixels."""
+        return random_png(self.rng)
+
+
+async def insert_rows(model: Any, rows: Any) -> None:
+    """Insert the rows in batches."""
+    table = model.Meta.table
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == BATCH_SIZE:
+            await database.execute(table.insert().values(batch))
+            batch = []
+    if batch:
+        await database.execute(table.insert().values(batch))
+
+
+async def seed(data: DataSet, sizes: list[int]) -> dict[str, Any]:
+    """Replace the data of the previous run with the same seed."""
+    # brands and products are removed by the cascade
+    await UserModel.objects.filter(email=data.email).delete()
+    owner_id = data.uuid()
+    await insert_rows(UserModel, [{
+        "id": owner_id,
+        "email": data.email,
+        "password": await get_password_hash(PASSWORD),
+        "name": "load",
+        "created_time": EPOCH,
+        "is_active": True,
+        "is_superuser": False,
+    }])
+    brands = {
+        name: data.brand(owner_id, name)
+        for name in ["read", "upload", "patch", *[f"products-{s}" for s in sizes]]  # noqa: E501
+    }
+    await insert_rows(BrandModel, brands.values())
+    await insert_rows(
+        ProductModel, data.products(brands["patch"]["id"], 10))
+    for size in sizes:
+        brand_id = brands[f"products-{size}"]["id"]
+        await insert_rows(ProductModel, data.products(brand_id, size))
+    await refresh_summaries()
+    return {name: str(brand["id"]) for name, brand in brands.items()}
+
+
+def scenarios(
+    data: DataSet, brand_ids: dict[str, str], sizes: list[int]
+) -> dict[str, Request]:
+    """Get the request of every scenario by name."""
+    prefix = settings.API_PREFIX
+    auth = {"Authorization": f"Bearer {create_access_token(data.email)}"}
+    image = data.image()
+    uploads = count()
+    patches = count()
+
+    async def login(
+        client: httpx.AsyncClient, worker: int
+    ) -> httpx.Response:
+        return await client.post(
+            f"{prefix}/auth/access-token",
+            data={"username": data.email, "password": PASSWORD},
+        )
+
+    async def brand_read(
+        client: httpx.AsyncClient, worker: int
+    ) -> httpx.Response:
+        return await client.get(f"{prefix}/brands/{brand_ids['read']}")
+
+    def products(size: int) -> Request:
+        brand_id = brand_ids[f"products-{size}"]
+        cursors: dict[int, str | None] = {}
+
+        async def request(
+            client: httpx.AsyncClient, worker: int
+        ) -> httpx.Response:
+            cursor = cursors.get(worker)
+            response = await client.get(
+                f"{prefix}/{brand_id}/products",
+                params={"cursor": cursor} if cursor else {},
+            )
+            if response.status_code == 200:
+                cursors[worker] = response.json()["next_cursor"]
+            return response
+
+        return request
+
+    async def image_upload(
+        client: httpx.AsyncClient, worker: int
+    ) -> httpx.Response:
+        return await client.post(
+            f"{prefix}/{brand_ids['upload']}/products",
+            data={
+                "title": f"upload-{next(uploads)}",
+                "discount_rate": "0.1",
+            },
+            files={"image": ("image.png", image, "image/png")},
+            headers=auth,
+        )
+
+    async def product_patch(
+        client: httpx.AsyncClient, worker: int
+    ) -> httpx.Response:
+        return await client.patch(
+            f"{prefix}/{brand_ids['patch']}/products",
+            params={"title": "product-0"},
+            json={"discount_rate": next(patches) % 100 / 100},
+            headers=auth,
+        )
+
+    return {
+        "login": login,
+        "brand_read": brand_read,
+        **{f"products_{size}": products(size) for size in sizes},
+        "image_upload": image_upload,
+        "product_patch": product_patch,
+    }
+
+
+def peak_rss_mb(server_pid: int | None) -> float | None:
+    """Get the peak RSS of the server, None if unknown."""
+    if server_pid is None:
+        # in process, ru_maxrss is in kilobytes on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    try:
+        with open(f"/proc/{server_pid}/status") as file:
+            for line in file:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    request: Request,
+    requests: int,
+    concurrency: int,
+) -> dict[str, Any]:
+    """Send `requests` requests from `concurrency` workers."""
+    timings: list[float] = []
+    errors = 0
+    remaining = iter(range(requests))
+
+    async def worker(worker_id: int) -> None:
+        nonlocal errors
+        for _ in remaining:
+            started = time.perf_counter()
+            response = await request(client, worker_id)
+            timings.append((time.perf_counter() - started) * 1000)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    if len(timings) > 1:
+        percentiles = statistics.quantiles(
+            timings, n=100, method="inclusive")
+    else:
+        percentiles = timings * 99
+    return {
+        "requests": requests,
+        "errors": errors,
+        "mean_ms": round(statistics.mean(timings), 3),
+        "p50_ms": round(percentiles[49], 3),
+        "p95_ms": round(percentiles[94], 3),
+        "p99_ms": round(percentiles[98], 3),
+        "rps": round(requests / elapsed, 1),
+    }
+
+
+def git_commit() -> str | None:
+    """Get the commit of the working tree, None outside a repository."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, check=True, text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def main(args: argparse.Namespace) -> None:
+    """Run the load test and write the results."""
+    await database.connect()
+    try:
+        data = DataSet(args.seed)
+        # in its own task, so the connection it binds to its context is not
+        # shared with the workers and the requests of the app in process
+        brand_ids = await asyncio.create_task(seed(data, args.sizes))
+        requests = scenarios(data, brand_ids, args.sizes)
+        selected = args.scenarios or list(requests)
+        if args.url:
+            client = httpx.AsyncClient(base_url=args.url, timeout=60)
+        else:
+            from app.main import app
+            client = httpx.AsyncClient(
+                app=app, base_url="http://load", timeout=60)
+        results = {}
+        async with client:
+            for name in selected:
+                # warm up the connections and the caches
+                await run_scenario(
+                    client, requests[name], args.concurrency,
+                    args.concurrency)
+                result = await run_scenario(
+                    client, requests[name], args.requests, args.concurrency)
+                result["peak_rss_mb"] = peak_rss_mb(args.server_pid)
+                results[name] = result
+                print(
+                    f"{name:>16} {result['p50_ms']:>9.2f} "
+                    f"{result['p95_ms']:>9.2f} {result['p99_ms']:>9.2f} "
+                    f"{result['rps']:>9.1f} {result['errors']:>6}",
+                    file=sys.stderr,
+                )
+        output = {
+            "commit": git_commit(),
+            "created_time": datetime.now(timezone.utc).isoformat(),
+            "options": {
+                "url": args.url,
+                "seed": args.seed,
+                "sizes": args.sizes,
+                "requests": args.requests,
+                "concurrency": args.concurrency,
+            },
+            "scenarios": results,
+        }
+        with open(args.output, "w") as file:
+            json.dump(output, file, indent=2)
+    finally:
+        try:
+            await asyncio.wait_for(database.disconnect(), DISCONNECT_TIMEOUT)
+        except asyncio.TimeoutError:
+            print("timed out closing the connection pool", file=sys.stderr)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", help="A running server, default in process.")
+    parser.add_argument("--server-pid", type=int)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10, 1000, 50000])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--scenarios", nargs="+")
+    parser.add_argument("--output", default="results.json")
+    args = parser.parse_args()
+    print(
+        f"{'scenario':>16} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+        f"{'req/s':>9} {'errors':>6}",
+        file=sys.stderr,
+    )
+    asyncio.run(main(args))
@@ -0,0 +1,104 @@
+"""
+Benchmark `PATCH /api/{brand_id}/products` against catalog size.
+
+Seed one brand per catalog size into the configured database, then
+time the same PATCH on each brand. The latency should not depend on
+how many products the brand has.
+
+Requires `httpx` and a migrated database (`alembic upgrade head`).
+
+Usage:
+    $ python -m benchmarks.patch_product --sizes 10 1000 10000
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import datetime
+from uuid import uuid4
+
+import httpx
+
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.crud.user import CRUDUser
+from app.db.session import database
+from app.main import app
+from app.models.brand import Brand as BrandModel
+from app.models.product import Product as ProductModel
+
+BATCH_SIZE = 1000
+
+
+async def seed_brand(owner, size: int) -> BrandModel:
+    """Create a brand with `size` products."""
+    brand = await BrandModel.objects.create(
+        name=f"bench-{size}", email="bench@example.com", owner=owner)
+    table = ProductModel.Meta.table
+    for start in range(0, size, BATCH_SIZE):
+        await database.execute(table.insert().values([
+            {
+                "id": str(uuid4()),
+                "title": f"product-{i}",
+                "discount_rate": 0.1,
+                "created_time": datetime.now(),
+                "brand": str(brand.id),
+            }
+            for i in range(start, min(start + BATCH_SIZE, size))
+        ]))
+    return brand
+
+
+async def time_patch(
+    client: httpx.AsyncClient, brand: BrandModel, requests: int
+) -> list[float]:
+    """Time PATCH requests on the first product of the brand."""
+    timings = []
+    for i in range(requests):
+        started = time.perf_counter()
+        response = await client.patch(
+            f"{settings.API_PREFIX}/{brand.id}/products",
+            params={"title": "product-0"},
+            json={"discount_rate": (i % 100) / 100},
+        )
+        timings.append((time.perf_counter() - started) * 1000)
+        response.raise_for_status()
+    return timings
+
+
+async def main(sizes: list[int], requests: int) -> None:
+    """Run the benchmark."""
+    await database.connect()
+    owner = await CRUDUser.create(obj_in={
+        "email": f"bench-{uuid4().hex}@example.com",
+        "password": uuid4().hex,
+        "name": "bench",
+    })
+    headers = {"Authorization": f"Bearer {create_access_token(owner.email)}"}
+    try:
+        async with httpx.AsyncClient(
+            app=app, base_url="http://bench", headers=headers
+        ) as client:
+            print(f"{'products':>10} {'mean ms':>10} {'p50 ms':>10} {'p95 ms':>10}")  # noqa: E501
+            for size in sizes:
+                brand = await seed_brand(owner, size)
+                await time_patch(client, brand, requests=10)  # warm up
+                timings = await time_patch(client, brand, requests)
+                p95 = statistics.quantiles(timings, n=20)[-1]
+                print(
+                    f"{size:>10} {statistics.mean(timings):>10.2f} "
+                    f"{statistics.median(timings):>10.2f} {p95:>10.2f}"
+                )
+    finally:
+        # brands and products are removed by the cascade
+        await CRUDUser.remove(user_obj=owner)
+        await database.disconnect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10, 1000, 10000])
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.sizes, args.requests))
@@ -0,0 +1,365 @@
+"""
+Seed the configured database with a large deterministic data set.
+
+Generate users, brands and products from a fixed seed and bulk load
+them with `COPY` (postgres) in parallel batches. Every batch has its own
+random generator derived from the seed, so the rows do not depend on
+the order the batches run in. Products are spread over the brands with
+a long tail, a share of them reference image blobs.
+
+All users have the password `password`, it is hashed once.
+
+On postgres the secondary indexes of the products (the ones that do
+not back a constraint) are dropped before the load and built again
+after it, in parallel, which is much faster than updating them row by
+row.
+
+The product summary of the brands is computed once at the end.
+
+Requires a migrated, empty database (`alembic upgrade head`), pass
+`--truncate` to empty it first.
+
+Usage:
+    $ python -m benchmarks.seed --users 5000 --brands 50000 \\
+        --products 5000000 --jobs 4
+"""
+import argparse
+import asyncio
+import hashlib
+import random
+import struct
+import time
+import zlib
+from datetime import datetime, timedelta
+from typing import Any, Callable
+from uuid import UUID
+
+import sqlalchemy
+
+from app.core import imaging
+from app.core.security import get_password_hash
+from app.db.session import database
+from app.models.brand import Brand as BrandModel
+from app.models.product import Product as ProductModel
+from app.models.user import User as UserModel
+from app.storage.store import blob_store
+
+BATCH_SIZE = 10000
+# rows per INSERT when COPY is not available
+INSERT_SIZE = 1000
+PASSWORD = "password"
+EPOCH = datetime(2022, 1, 1)
+WORDS = (
+    "red blue green black white linen cotton wool leather silk denim "
+    "shirt dress jacket coat scarf boots sneakers bag belt hat socks "
+    "classic modern vintage slim oversized light warm organic recycled"
+).split()
+
+USER_COLUMNS = [
+    "id", "email", "password", "name", "created_time", "is_active",
+    "is_superuser",
+]
+BRAND_COLUMNS = [
+    "id", "name", "about", "email", "created_time", "is_active", "owner",
+]
+PRODUCT_COLUMNS = [
+    "id", "title", "description", "discount_rate", "image_id",
+    "image_type", "image_thumbnail_id", "image_medium_id", "created_time",
+    "brand",
+]
+
+
+def make_id(seed: int, kind: str, index: int) -> UUID:
+    """Get the id of the `index`-th row of a kind."""
+    digest = hashlib.md5(f"{seed}:{kind}:{index}".encode()).digest()
+    return UUID(bytes=digest, version=4)
+
+
+def random_png(rng: random.Random, width: int = 256, height: int = 256) -> bytes:  # noqa: E501
+    """Get a PNG of random pixels."""
+    raw = b"".join(b"\x00" + rng.randbytes(width * 3) for _ in range(height))
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        body = kind + data
+        return (
+            struct.pack(">I", len(data)) + body
+            + struct.pack(">I", zlib.crc32(body)))
+
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))  # noqa: E501
+        + chunk(b"IDAT", zlib.compress(raw))
+        + chunk(b"IEND", b"")
+    )
+
+
+class Generator:
+    """
+    Rows of the data set, in the column order of the tables.
+
+    Values are in their database representation (ids as strings),
+    so they can be copied as they are.
+    """
+
+    def __init__(
+        self,
+        seed: int,
+        *,
+        users: int,
+        brands: int,
+        image_ratio: float,
+        images: list[tuple[str, str, str | None, str | None]],
+        password: str,
+    ):
+        """Initialize."""
+        self.seed = seed
+        self.n_users = users
+        self.n_brands = brands
+        self.image_ratio = image_ratio
+        self.images = images
+        self.password = password
+
+    def rng(self, kind: str, start: int) -> random.Random:
+        """Get the random generator of a batch."""
+        return random.Random(f"{self.seed}:{kind}:{start}")
+
+    def user_id(self, index: int) -> str:
+        """Get the id of a user (hex format)."""
+        return make_id(self.seed, "user", index).hex
+
+    def brand_id(self, index: int) -> str:
+        """Get the id of a brand (string format)."""
+        return str(make_id(self.seed, "brand", index))
+
+    def users(self, start: int, stop: int) -> list[tuple]:
+        """Get the users of a batch."""
+        return [
+            (
+                self.user_id(i),
+                f"user-{i}@example.com",
+                self.password,
+                f"user {i}",
+                EPOCH + timedelta(minutes=i),
+                True,
+                False,
+            )
+            for i in range(start, stop)
+        ]
+
+    def brands(self, start: int, stop: int) -> list[tuple]:
+        """Get the brands of a batch, 90% are active."""
+        rng = self.rng("brand", start)
+        return [
+            (
+                self.brand_id(i),
+                f"brand {i}",
+                " ".join(rng.choices(WORDS, k=12)),
+                f"brand-{i}@example.com",
+                EPOCH + timedelta(minutes=i),
+                rng.random() < 0.9,
+                self.user_id(i % self.n_users),
+            )
+            for i in range(start, stop)
+        ]
+
+    def products(self, start: int, stop: int) -> list[tuple]:
+        """Get the products of a batch, a few brands have most of them."""
+        rng = self.rng("product", start)
+        rows = []
+        for i in range(start, stop):
+            image = (None, None, None, None)
+            if self.images and rng.random() < self.image_ratio:
+                image = rng.choice(self.images)
+            rows.append((
+                str(make_id(self.seed, "product", i)),
+                f"{' '.join(rng.choices(WORDS, k=3))} {i}",
+                " ".join(rng.choices(WORDS, k=20)),
+                round(rng.random() * 0.9, 2),
+                *image,
+                EPOCH + timedelta(seconds=i),
+                self.brand_id(int(self.n_brands * rng.random() ** 3)),
+            ))
+        return rows
+
+
+async def copy_rows(model: Any, columns: list[str], records: list[tuple]) -> None:  # noqa: E501
+    """Bulk load the rows, with `COPY` on postgres."""
+    table = model.Meta.table
+    async with database.connection() as connection:
+        if database.url.dialect == "postgresql":
+            await connection.raw_connection.copy_records_to_table(
+                table.name, records=records, columns=columns)
+            return
+        # an untyped table, the values are already converted
+        raw_table = sqlalchemy.table(
+            table.name, *map(sqlalchemy.column, columns))
+        for start in range(0, len(records), INSERT_SIZE):
+            await connection.execute(raw_table.insert().values([
+                dict(zip(columns, record))
+                for record in records[start:start + INSERT_SIZE]
+            ]))
+
+
+async def load(
+    model: Any,
+    columns: list[str],
+    make_batch: Callable[[int, int], list[tuple]],
+    total: int,
+    jobs: int,
+) -> None:
+    """Generate and load `total` rows in batches, `jobs` at a time."""
+    started = time.perf_counter()
+    batches = iter(range(0, total, BATCH_SIZE))
+
+    async def worker() -> None:
+        # every worker copies on its own connection
+        for start in batches:
+            records = make_batch(start, min(start + BATCH_SIZE, total))
+            await copy_rows(model, columns, records)
+
+    await asyncio.gather(*(worker() for _ in range(jobs)))
+    elapsed = time.perf_counter() - started
+    print(
+        f"{model.Meta.tablename:>8} {total:>10} rows {elapsed:>8.1f} s "
+        f"{total / elapsed * 60:>12,.0f} rows/min"
+    )
+
+
+async def create_images(
+    seed: int, number: int
+) -> list[tuple[str, str, str | None, str | None]]:
+    """Put `number` images and their variants to the blob store."""
+    images = []
+    for i in range(number):
+        data = random_png(random.Random(f"{seed}:image:{i}"))
+        thumbnail_id = medium_id = None
+        if imaging.is_available():
+            variants = await imaging.create_variants(data)
+            thumbnail_id = await blob_store.put(variants["thumbnail"])
+            medium_id = await blob_store.put(variants["medium"])
+        images.append(
+            (await blob_store.put(data), "image/png", thumbnail_id, medium_id))
+    return images
+
+
+async def refresh_summaries() -> None:
+    """Compute the product summary of every brand from its products."""
+    brand = BrandModel.Meta.table
+    table = ProductModel.Meta.table
+
+    def aggregate(column: Any) -> Any:
+        return (
+            sqlalchemy.select([column])
+            .where(table.c.brand == brand.c.id)
+            .scalar_subquery()
+        )
+
+    await database.execute(brand.update().values(
+        product_count=aggregate(sqlalchemy.func.count()),
+        max_discount_rate=aggregate(
+            sqlalchemy.func.max(table.c.discount_rate)),
+        products_updated_time=aggregate(
+            sqlalchemy.func.max(table.c.created_time)),
+    ))
+
+
+async def drop_indexes(model: Any) -> list[str]:
+    """Drop the indexes of a table that back no constraint (postgres)."""
+    if database.url.dialect != "postgresql":
+        return []
+    rows = await database.fetch_all(
+        """
+        SELECT indexname, indexdef FROM pg_indexes
+        WHERE schemaname = current_schema() AND tablename = :table
+        AND indexname NOT IN (SELECT conname FROM pg_constraint)
+        """,
+        {"table": model.Meta.tablename},
+    )
+    for row in rows:
+        await database.execute(f'DROP INDEX "{row["indexname"]}"')
+    return [row["indexdef"] for row in rows]
+
+
+async def create_indexes(definitions: list[str], jobs: int) -> None:
+    """Create the indexes, `jobs` at a time."""
+    started = time.perf_counter()
+    remaining = iter(definitions)
+
+    async def worker() -> None:
+        # every worker builds on its own connection
+        for definition in remaining:
+            await database.execute(definition)
+
+    await asyncio.gather(*(worker() for _ in range(jobs)))
+    print(
+        f"{'indexes':>8} {len(definitions):>10} "
+        f"{time.perf_counter() - started:>13.1f} s"
+    )
+
+
+async def truncate() -> None:
+    """Delete all users, brands and products."""
+    if database.url.dialect == "postgresql":
+        await database.execute(
+            'TRUNCATE TABLE "user", brand, product CASCADE')
+        return
+    for model in (ProductModel, BrandModel, UserModel):
+        await database.execute(model.Meta.table.delete())
+
+
+async def main(args: argparse.Namespace) -> None:
+    """Seed the database."""
+    await database.connect()
+    try:
+        # the steps before the loads run in their own task, so the
+        # connection they bind to the context is not inherited by the
+        # workers, which need one each
+        if args.truncate:
+            await asyncio.create_task(truncate())
+        generator = Generator(
+            args.seed,
+            users=args.users,
+            brands=args.brands,
+            image_ratio=args.image_ratio,
+            images=await create_images(args.seed, args.images),
+            password=await get_password_hash(PASSWORD),
+        )
+        await load(
+            UserModel, USER_COLUMNS, generator.users, args.users, args.jobs)
+        await load(
+            BrandModel, BRAND_COLUMNS, generator.brands, args.brands,
+            args.jobs)
+        indexes = await asyncio.create_task(drop_indexes(ProductModel))
+        try:
+            await load(
+                ProductModel, PRODUCT_COLUMNS, generator.products,
+                args.products, args.jobs)
+        finally:
+            await create_indexes(indexes, args.jobs)
+        await refresh_summaries()
+        if database.url.dialect == "postgresql":
+            # fresh planner statistics for the new rows
+            await database.execute("ANALYZE")
+    finally:
+        await database.disconnect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--brands", type=int, default=50000)
+    parser.add_argument("--products", type=int, default=5000000)
+    parser.add_argument(
+        "--images", type=int, default=20,
+        help="The number of distinct images.")
+    parser.add_argument(
+        "--image-ratio", type=float, default=0.05,
+        help="The share of products with an image.")
+    parser.add_argument(
+        "--jobs", type=int, default=4, help="The batches loaded at a time.")
+    parser.add_argument(
+        "--truncate", action="store_true",
+        help="Delete all users, brands and products first.")
+    args = parser.parse_args()
+    asyncio.run(main(args))
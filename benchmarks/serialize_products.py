@@ -0,0 +1,84 @@
+"""
+Benchmark serializing a page of products to JSON.
+
+Compare rows per second of the model path (ormar models validated
+through the `ProductPage` schema) with the values path (rows dumped as
+read) that the listing endpoints use. Both include the query.
+
+Requires a migrated database (`alembic upgrade head`).
+
+Usage:
+    $ python -m benchmarks.serialize_products --limits 50 200 1000
+"""
+import argparse
+import asyncio
+import time
+from uuid import uuid4
+
+from app.core.http import dump_json, render_json
+from app.crud.pagination import paginate
+from app.crud.product import CRUDProduct
+from app.crud.user import CRUDUser
+from app.db.session import database
+from app.endpoints.product import PRODUCT_FIELDS
+from app.models.product import Product as ProductModel
+from app.schemas.product import ProductPage
+
+from .patch_product import seed_brand
+
+
+async def model_path(brand_id: str, limit: int) -> bytes:
+    """Serialize a page through ormar models and the response schema."""
+    products, next_cursor = await paginate(
+        ProductModel.objects.filter(brand=brand_id), ProductModel,
+        limit=limit)
+    return render_json(ProductPage(items=products, next_cursor=next_cursor))
+
+
+async def values_path(brand_id: str, limit: int) -> bytes:
+    """Serialize a page from the row values."""
+    products, next_cursor = await CRUDProduct.get_all_values(
+        brand_id=brand_id, limit=limit, fields=PRODUCT_FIELDS)
+    return dump_json({"items": products, "next_cursor": next_cursor})
+
+
+async def rows_per_second(path, brand_id: str, limit: int, number: int) -> float:  # noqa: E501
+    """Time `number` pages of the path."""
+    await path(brand_id, limit)  # warm up
+    started = time.perf_counter()
+    for _ in range(number):
+        await path(brand_id, limit)
+    return limit * number / (time.perf_counter() - started)
+
+
+async def main(limits: list[int], number: int) -> None:
+    """Run the benchmark."""
+    await database.connect()
+    owner = await CRUDUser.create(obj_in={
+        "email": f"bench-{uuid4().hex}@example.com",
+        "password": uuid4().hex,
+        "name": "bench",
+    })
+    try:
+        brand = await seed_brand(owner, max(limits))
+        print(f"{'rows':>6} {'model rows/s':>14} {'values rows/s':>14} {'speedup':>8}")  # noqa: E501
+        for limit in limits:
+            model = await rows_per_second(model_path, brand.id, limit, number)
+            values = await rows_per_second(values_path, brand.id, limit, number)  # noqa: E501
+            print(
+                f"{limit:>6} {model:>14.0f} {values:>14.0f} "
+                f"{values / model:>7.1f}x"
+            )
+    finally:
+        # brands and products are removed by the cascade
+        await CRUDUser.remove(user_obj=owner)
+        await database.disconnect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--limits", type=int, nargs="+", default=[50, 200, 1000])
+    parser.add_argument("--number", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.limits, args.number))
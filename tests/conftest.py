@@ -0,0 +1,142 @@
+"""
+Fixtures.
+
+The tests run the app against the postgres database of
+`TEST_DATABASE_URI`, it is migrated and emptied first. They are
+skipped when it is not set.
+"""
+import logging
+import os
+import tempfile
+from typing import Any, Callable, Iterator
+from uuid import uuid4
+
+import pytest
+
+TEST_DATABASE_URI = os.environ.get("TEST_DATABASE_URI")
+if TEST_DATABASE_URI:
+    # before the settings are read
+    os.environ["SQLALCHEMY_DATABASE_URI"] = TEST_DATABASE_URI
+    os.environ.pop("REPLICA_DATABASE_URI", None)
+    os.environ["BLOB_STORE_ROOT"] = tempfile.mkdtemp(prefix="blobs-")
+    os.environ["PASSWORD_HASH_ROUNDS"] = "4"
+    os.environ["DB_POOL_MIN_SIZE"] = "1"
+
+TABLES = '"user", brand, product'
+
+
+@pytest.fixture(scope="session")
+def engine() -> Iterator[Any]:
+    """Migrate and empty the test database, get a sync engine for it."""
+    if not TEST_DATABASE_URI:
+        pytest.skip("TEST_DATABASE_URI is not set")
+    import sqlalchemy
+    from alembic import command
+    from alembic.config import Config
+
+    root = os.path.dirname(os.path.dirname(__file__))
+    command.upgrade(Config(os.path.join(root, "alembic.ini")), "head")
+    # the logging config of alembic disables the loggers of the app
+    for logger in logging.root.manager.loggerDict.values():
+        if isinstance(logger, logging.Logger):
+            logger.disabled = False
+    engine = sqlalchemy.create_engine(TEST_DATABASE_URI)
+    with engine.begin() as connection:
+        connection.execute(sqlalchemy.text(f"TRUNCATE TABLE {TABLES} CASCADE"))  # noqa: E501
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture(scope="session")
+def client(engine: Any) -> Iterator[Any]:
+    """Get a client of the app, connected to the test database."""
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def scalar(engine: Any) -> Callable[..., Any]:
+    """Get a function that runs a query on the test database."""
+    import sqlalchemy
+
+    def scalar(query: str, **params: Any) -> Any:
+        with engine.connect() as connection:
+            return connection.execute(
+                sqlalchemy.text(query), params).scalar()
+
+    return scalar
+
+
+@pytest.fixture
+def login(
+    client: Any, scalar: Callable[..., Any]
+) -> Callable[..., dict[str, str]]:
+    """Get a function that registers a new user, gets its auth headers."""
+
+    def login(superuser: bool = False) -> dict[str, str]:
+        email = f"{uuid4().hex}@example.com"
+        response = client.post("/api/users", json={
+            "email": email, "password": "secret1", "name": "test"})
+        assert response.status_code == 201, response.text
+        if superuser:
+            scalar(
+                'UPDATE "user" SET is_superuser = true WHERE email = :email '
+                "RETURNING id",
+                email=email,
+            )
+        response = client.post("/api/auth/access-token", data={
+            "username": email, "password": "secret1"})
+        assert response.status_code == 200, response.text
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}  # noqa: E501
+
+    return login
+
+
+@pytest.fixture
+def headers(login: Callable[[], dict[str, str]]) -> dict[str, str]:
+    """Get the auth headers of a new user."""
+    return login()
+
+
+@pytest.fixture
+def create_brand(client: Any, headers: dict[str, str]) -> Callable[..., str]:
+    """Get a function that creates a brand of the user, gets its id."""
+
+    def create_brand(**data: Any) -> str:
+        response = client.post(
+            "/api/brands",
+            json={"name": uuid4().hex, "email": "brand@example.com", **data},
+            headers=headers,
+        )
+        assert response.status_code == 201, response.text
+        return response.json()["id"]
+
+    return create_brand
+
+
+@pytest.fixture
+def brand_id(create_brand: Callable[..., str]) -> str:
+    """Get the id of a new brand of the user."""
+    return create_brand()
+
+
+@pytest.fixture
+def import_products(
+    client: Any, headers: dict[str, str]
+) -> Callable[..., Any]:
+    """Get a function that imports products to a brand."""
+
+    def import_products(brand_id: str, products: list[dict[str, Any]]):
+        response = client.post(
+            f"/api/{brand_id}/products/import",
+            json=products,
+            headers=headers,
+        )
+        assert response.status_code == 200, response.text
+        return response.json()
+
+    return import_products
@@ -0,0 +1,72 @@
+"""Tests of the batch brand lookup."""
+from uuid import uuid4
+
+from app.endpoints.brand import MAX_BATCH_IDS
+
+
+def test_get_brands_batch(
+    client, headers, login, create_brand, import_products
+):
+    active_id = create_brand()
+    import_products(active_id, [{"title": "batch", "discount_rate": 0.2}])
+    inactive_id = create_brand()
+    response = client.patch(
+        f"/api/brands/{inactive_id}", json={"is_active": False},
+        headers=headers)
+    assert response.status_code == 200, response.text
+    missing_id = str(uuid4())
+    params = {"brand_id": [missing_id, inactive_id, active_id, active_id]}
+
+    response = client.get("/api/brands/batch", params=params)
+    assert response.status_code == 200, response.text
+    batch = response.json()
+    assert [brand["id"] for brand in batch["items"]] == [active_id]
+    assert batch["items"][0]["products"] is None
+    assert batch["not_found"] == [missing_id, inactive_id]
+
+    response = client.get(
+        "/api/brands/batch", params={**params, "products": True},
+        headers=headers)
+    assert response.status_code == 200, response.text
+    batch = response.json()
+    assert [brand["id"] for brand in batch["items"]] == [
+        inactive_id, active_id]
+    assert [p["title"] for p in batch["items"][1]["products"]] == ["batch"]
+    assert batch["items"][0]["products"] == []
+
+    response = client.get(
+        "/api/brands/batch", params=params, headers=login())
+    assert response.json()["not_found"] == [missing_id, inactive_id]
+
+
+def test_get_brands_batch_limits_ids(client):
+    response = client.get(
+        "/api/brands/batch",
+        params={"brand_id": [str(uuid4()) for _ in range(MAX_BATCH_IDS + 1)]},
+    )
+
+    assert response.status_code == 400
+
+
+def test_get_brands_batch_fields(client, create_brand, import_products):
+    brand_id = create_brand()
+    import_products(brand_id, [{"title": "fields", "discount_rate": 0.2}])
+    params = {"brand_id": [brand_id, str(uuid4())], "products": True}
+
+    response = client.get(
+        "/api/brands/batch", params={**params, "fields": "name"})
+    assert response.status_code == 200, response.text
+    batch = response.json()
+    assert [list(brand) for brand in batch["items"]] == [["name"]]
+    assert batch["not_found"] == params["brand_id"][1:]
+
+    response = client.get(
+        "/api/brands/batch", params={**params, "fields": "id,products"})
+    assert response.status_code == 200, response.text
+    brand, = response.json()["items"]
+    assert list(brand) == ["id", "products"]
+    assert [p["title"] for p in brand["products"]] == ["fields"]
+
+    response = client.get(
+        "/api/brands/batch", params={**params, "fields": "owner"})
+    assert response.status_code == 400
@@ -0,0 +1,28 @@
+"""Tests of the brand detail."""
+
+
+def test_get_brand_fields(client, brand_id, import_products):
+    import_products(brand_id, [{"title": "detail", "discount_rate": 0.2}])
+
+    response = client.get(
+        f"/api/brands/{brand_id}", params={"fields": "name"})
+    assert response.status_code == 200, response.text
+    assert list(response.json()) == ["name"]
+
+    response = client.get(
+        f"/api/brands/{brand_id}", params={"fields": "id,products"})
+    assert response.status_code == 200, response.text
+    brand = response.json()
+    assert brand["id"] == brand_id
+    assert "detail" in [product["title"] for product in brand["products"]]
+
+    response = client.get(f"/api/brands/{brand_id}")
+    assert response.status_code == 200, response.text
+    assert {"name", "is_active", "products"} <= set(response.json())
+
+
+def test_get_brand_rejects_unknown_fields(client, brand_id):
+    response = client.get(
+        f"/api/brands/{brand_id}", params={"fields": "name,owner"})
+
+    assert response.status_code == 400
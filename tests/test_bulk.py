@@ -0,0 +1,82 @@
+"""Tests of the bulk product update and delete."""
+import pytest
+
+from app.crud import product as crud_product
+
+
+@pytest.fixture
+def product_ids(brand_id, import_products):
+    report = import_products(brand_id, [
+        {"title": f"bulk-{i}", "discount_rate": 0.1} for i in range(3)])
+    return [result["id"] for result in report["results"]]
+
+
+def test_bulk_update(client, headers, brand_id, product_ids, scalar):
+    response = client.patch(
+        f"/api/{brand_id}/products/bulk",
+        json={
+            "ids": [product_ids[0]],
+            "titles": ["bulk-1", "missing"],
+            "changes": {"discount_rate": 0.5},
+        },
+        headers=headers,
+    )
+
+    assert response.status_code == 200, response.text
+    report = response.json()
+    assert report["count"] == 2
+    assert [result["status"] for result in report["results"]] == [
+        "updated", "updated", "not_found"]
+    assert scalar(
+        "SELECT count(*) FROM product WHERE brand = :brand "
+        "AND discount_rate = 0.5", brand=brand_id) == 2
+    assert scalar(
+        "SELECT max_discount_rate FROM brand WHERE id = :brand",
+        brand=brand_id) == 0.5
+
+
+def test_bulk_delete(client, headers, brand_id, product_ids, scalar):
+    response = client.delete(
+        f"/api/{brand_id}/products/bulk",
+        json={"ids": product_ids[:2]},
+        headers=headers,
+    )
+
+    assert response.status_code == 200, response.text
+    assert response.json()["count"] == 2
+    assert scalar(
+        "SELECT count(*) FROM product WHERE brand = :brand",
+        brand=brand_id) == 1
+    assert scalar(
+        "SELECT product_count FROM brand WHERE id = :brand",
+        brand=brand_id) == 1
+
+
+def test_bulk_update_rolls_back_on_error(
+    client, headers, brand_id, product_ids, scalar, monkeypatch
+):
+    async def fail(*args, **kwargs):
+        raise RuntimeError("summary failed")
+
+    monkeypatch.setattr(crud_product, "_update_summary", fail)
+
+    with pytest.raises(RuntimeError):
+        client.patch(
+            f"/api/{brand_id}/products/bulk",
+            json={"ids": product_ids, "changes": {"discount_rate": 0.9}},
+            headers=headers,
+        )
+
+    assert scalar(
+        "SELECT max(discount_rate) FROM product WHERE brand = :brand",
+        brand=brand_id) == 0.1
+
+
+def test_bulk_requires_own_brand(client, login, brand_id, product_ids):
+    response = client.delete(
+        f"/api/{brand_id}/products/bulk",
+        json={"ids": product_ids},
+        headers=login(),
+    )
+
+    assert response.status_code == 404
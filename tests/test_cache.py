@@ -0,0 +1,71 @@
+"""Tests of the response cache."""
+import asyncio
+
+from app.core.cache import MemoryCacheBackend, ResponseCache
+
+
+def make_cache():
+    return ResponseCache(MemoryCacheBackend(maxsize=100), ttl=60)
+
+
+def test_cache_starts_a_generation_before_caching():
+    cache = make_cache()
+
+    async def run():
+        body, generation = await cache.get("brand", "detail")
+        assert (body, generation) == (None, None)
+        await cache.set("brand", "detail", b"first", generation)
+        body, generation = await cache.get("brand", "detail")
+        assert body is None
+        await cache.set("brand", "detail", b"second", generation)
+        return await cache.get("brand", "detail")
+
+    body, generation = asyncio.run(run())
+
+    assert body == b"second"
+    assert generation is not None
+
+
+def test_cache_drops_responses_read_before_invalidation():
+    cache = make_cache()
+
+    async def run():
+        await cache.get("brand", "detail")
+        # read before the write, stored after its invalidation
+        _, generation = await cache.get("brand", "detail")
+        await cache.invalidate("brand")
+        await cache.set("brand", "detail", b"stale", generation)
+        return await cache.get("brand", "detail")
+
+    body, generation = asyncio.run(run())
+
+    assert body is None
+    assert generation is not None
+
+
+def test_cache_is_per_brand():
+    cache = make_cache()
+
+    async def run():
+        for brand_id in ("first", "second"):
+            await cache.get(brand_id, "detail")
+            _, generation = await cache.get(brand_id, "detail")
+            await cache.set(brand_id, "detail", brand_id.encode(), generation)
+        await cache.invalidate("first")
+        return [
+            (await cache.get(brand_id, "detail"))[0]
+            for brand_id in ("first", "second")
+        ]
+
+    assert asyncio.run(run()) == [None, b"second"]
+
+
+def test_cached_summary_follows_writes(client, brand_id, import_products):
+    for _ in range(2):
+        response = client.get(f"/api/brands/{brand_id}/summary")
+        assert response.json()["product_count"] == 0
+
+    import_products(brand_id, [{"title": "cached", "discount_rate": 0.1}])
+
+    response = client.get(f"/api/brands/{brand_id}/summary")
+    assert response.json()["product_count"] == 1
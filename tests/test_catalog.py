@@ -0,0 +1,40 @@
+"""Tests of the product catalog."""
+from app.crud.pagination import encode_cursor
+
+
+def test_catalog_walks_pages_by_discount(client, brand_id, import_products):
+    products = [
+        {"title": f"catalog-{i}", "discount_rate": i / 10} for i in range(5)]
+    import_products(brand_id, products)
+
+    titles = []
+    cursor = None
+    while True:
+        params = {"brand_id": brand_id, "sort": "discount", "limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/api/products", params=params)
+        assert response.status_code == 200, response.text
+        page = response.json()
+        assert all(item["brand_id"] == brand_id for item in page["items"])
+        titles.extend(item["title"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert titles == [f"catalog-{i}" for i in reversed(range(5))]
+
+
+def test_catalog_rejects_invalid_cursor(client):
+    response = client.get("/api/products", params={"cursor": "invalid"})
+    assert response.status_code == 400
+
+
+def test_catalog_accepts_cursor_id_of_other_types(client):
+    for sort, last in [
+        ("recent", ["2020-01-01T00:00:00", 1]),
+        ("discount", [0.5, "2020-01-01T00:00:00", None]),
+    ]:
+        response = client.get("/api/products", params={
+            "sort": sort, "cursor": encode_cursor(*last)})
+        assert response.status_code == 200, response.text
@@ -0,0 +1,29 @@
+"""Tests of the product export."""
+import json
+
+
+def test_export_ndjson_and_json(client, brand_id, import_products):
+    import_products(brand_id, [
+        {"title": f"export-{i}", "discount_rate": 0.1} for i in range(3)])
+
+    response = client.get(
+        f"/api/{brand_id}/products/export", params={"fields": "title"})
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines == [{"title": f"export-{i}"} for i in reversed(range(3))]
+
+    response = client.get(
+        f"/api/{brand_id}/products/export",
+        params={"format": "json", "fields": "title"},
+    )
+    assert response.status_code == 200, response.text
+    assert response.json() == lines
+    assert response.headers["content-disposition"].endswith('.json"')
+
+
+def test_export_rejects_unknown_format(client, brand_id):
+    response = client.get(
+        f"/api/{brand_id}/products/export", params={"format": "csv"})
+
+    assert response.status_code == 422
@@ -0,0 +1,67 @@
+"""Tests of the product images."""
+import random
+
+from benchmarks.seed import random_png
+
+
+def test_product_image_ranges(client, headers, brand_id):
+    image = random_png(random.Random(0), width=16, height=16)
+    response = client.post(
+        f"/api/{brand_id}/products",
+        data={"title": "image", "discount_rate": "0.1"},
+        files={"image": ("image.png", image, "image/png")},
+        headers=headers,
+    )
+    assert response.status_code == 201, response.text
+    url = f"/api/{brand_id}/products/{response.json()['id']}/image"
+
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.content == image
+    etag = response.headers["etag"]
+
+    response = client.get(url, headers={"Range": "bytes=0-9"})
+    assert response.status_code == 206
+    assert response.content == image[:10]
+    assert response.headers["content-range"] == f"bytes 0-9/{len(image)}"
+
+    response = client.get(
+        url, headers={"Range": "bytes=0-9", "If-Range": '"other"'})
+    assert response.status_code == 200
+
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    assert response.headers["x-content-type-options"] == "nosniff"
+    assert response.headers["content-security-policy"] == "sandbox"
+
+
+def test_product_image_type_is_detected(client, headers, brand_id):
+    image = random_png(random.Random(0), width=16, height=16)
+    response = client.post(
+        f"/api/{brand_id}/products",
+        data={"title": "claimed html", "discount_rate": "0.1"},
+        files={"image": ("image.html", image, "text/html")},
+        headers=headers,
+    )
+    assert response.status_code == 201, response.text
+
+    response = client.get(
+        f"/api/{brand_id}/products/{response.json()['id']}/image")
+
+    assert response.headers["content-type"] == "image/png"
+
+
+def test_product_image_rejects_other_content(client, headers, brand_id):
+    for name, data, content_type in [
+        ("page.html", b"<script>alert(1)</script>", "text/html"),
+        ("image.svg", b"<svg onload='alert(1)'/>", "image/svg+xml"),
+        ("image.png", b"<html></html>", "image/png"),
+    ]:
+        response = client.post(
+            f"/api/{brand_id}/products",
+            data={"title": name, "discount_rate": "0.1"},
+            files={"image": (name, data, content_type)},
+            headers=headers,
+        )
+        assert response.status_code == 415, name
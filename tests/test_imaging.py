@@ -0,0 +1,51 @@
+"""Tests of the image variants."""
+import io
+
+import pytest
+
+from app.core import imaging
+
+Image = pytest.importorskip("PIL.Image")
+
+SIZES = {"thumbnail": 20, "medium": 40}
+
+
+def encode(img, fmt="PNG"):
+    buf = io.BytesIO()
+    img.save(buf, format=fmt)
+    return buf.getvalue()
+
+
+def modes(variants):
+    return {
+        name: Image.open(io.BytesIO(data)).mode
+        for name, data in variants.items()
+    }
+
+
+@pytest.mark.parametrize("mode", ["RGBA", "LA", "P"])
+def test_transparent_image_to_jpeg(mode):
+    img = Image.new("RGBA", (80, 60), (255, 0, 0, 128)).convert(mode)
+    if mode == "P":
+        img.info["transparency"] = 0
+
+    variants = imaging.make_variants(encode(img), SIZES, "JPEG", 80)
+
+    assert modes(variants) == {"thumbnail": "RGB", "medium": "RGB"}
+    assert Image.open(io.BytesIO(variants["medium"])).size == (40, 30)
+
+
+def test_transparent_image_keeps_alpha_in_webp():
+    img = Image.new("RGBA", (80, 60), (255, 0, 0, 128))
+
+    variants = imaging.make_variants(encode(img), SIZES, "WEBP", 80)
+
+    assert modes(variants) == {"thumbnail": "RGBA", "medium": "RGBA"}
+
+
+def test_grayscale_image_to_jpeg():
+    img = Image.new("L", (80, 60), 128)
+
+    variants = imaging.make_variants(encode(img), SIZES, "JPEG", 80)
+
+    assert modes(variants) == {"thumbnail": "RGB", "medium": "RGB"}
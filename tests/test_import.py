@@ -0,0 +1,95 @@
+"""Tests of the product import."""
+import asyncio
+
+from app.core.config import settings
+from app.crud.product import CRUDProduct
+
+
+def test_import_reports_each_row(client, headers, brand_id, import_products):
+    import_products(brand_id, [{"title": "existing", "discount_rate": 0.1}])
+
+    report = import_products(brand_id, [
+        {"title": "new", "discount_rate": 0.2},
+        {"title": "existing", "discount_rate": 0.3},
+        {"title": "new", "discount_rate": 0.4},
+        {"title": "invalid"},
+    ])
+
+    assert report["created"] == 1
+    assert report["failed"] == 3
+    assert [result["status"] for result in report["results"]] == [
+        "created", "conflict", "conflict", "invalid"]
+    assert report["results"][1]["errors"] == [
+        "title: product already exists"]
+    assert report["results"][2]["errors"] == [
+        "title: duplicated in the import"]
+    summary = client.get(f"/api/brands/{brand_id}/summary", headers=headers)
+    assert summary.json()["product_count"] == 2
+
+
+def test_import_csv(client, headers, brand_id, scalar):
+    data = "title,discount_rate,description\nfirst,0.1,\nsecond,0.5,text\n"
+
+    response = client.post(
+        f"/api/{brand_id}/products/import/csv",
+        files={"file": ("products.csv", data.encode(), "text/csv")},
+        headers=headers,
+    )
+
+    assert response.status_code == 200, response.text
+    assert response.json()["created"] == 2
+    assert scalar(
+        "SELECT max(discount_rate) FROM product WHERE brand = :brand",
+        brand=brand_id) == 0.5
+
+
+def test_import_csv_rolls_back_on_invalid_file(
+    client, headers, brand_id, scalar, monkeypatch
+):
+    monkeypatch.setattr(settings, "IMPORT_BATCH_SIZE", 2)
+    rows = "".join(f"product-{i},0.1\n" for i in range(5))
+    # the last batch is not UTF-8, the first ones are already inserted
+    data = b"title,discount_rate\n" + rows.encode() + b"\xff\xfe,0.1\n"
+
+    response = client.post(
+        f"/api/{brand_id}/products/import/csv",
+        files={"file": ("products.csv", data, "text/csv")},
+        headers=headers,
+    )
+
+    assert response.status_code == 400
+    assert scalar(
+        "SELECT count(*) FROM product WHERE brand = :brand",
+        brand=brand_id) == 0
+    assert scalar(
+        "SELECT product_count FROM brand WHERE id = :brand",
+        brand=brand_id) == 0
+
+
+def test_import_requires_own_brand(client, login, brand_id):
+    response = client.post(
+        f"/api/{brand_id}/products/import",
+        json=[{"title": "new", "discount_rate": 0.1}],
+        headers=login(),
+    )
+
+    assert response.status_code == 404
+
+
+def test_concurrent_imports_conflict(client, brand_id, scalar):
+    async def batches():
+        yield [(1, {"title": "racing", "discount_rate": 0.1})]
+
+    async def import_twice():
+        return await asyncio.gather(
+            CRUDProduct.bulk_create(brand_id=brand_id, batches=batches()),
+            CRUDProduct.bulk_create(brand_id=brand_id, batches=batches()),
+        )
+
+    reports = client.portal.call(import_twice)
+
+    assert sorted(report[0]["status"] for report in reports) == [
+        "conflict", "created"]
+    assert scalar(
+        "SELECT product_count FROM brand WHERE id = :brand",
+        brand=brand_id) == 1
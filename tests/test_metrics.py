@@ -0,0 +1,87 @@
+"""Tests of the metrics."""
+import logging
+
+import pytest
+
+from app.core import metrics
+from app.crud.user import user_cache
+
+
+@pytest.fixture
+def superuser_headers(login):
+    return login(superuser=True)
+
+
+def test_metrics_require_a_superuser(
+    client, headers, superuser_headers, monkeypatch
+):
+    for path in ("/metrics", "/metrics/pool"):
+        assert client.get(path).status_code == 401
+        assert client.get(path, headers=headers).status_code == 403
+        response = client.get(path, headers=superuser_headers)
+        assert response.status_code == 200
+
+    monkeypatch.setattr(metrics.settings, "METRICS_PUBLIC", True)
+    assert client.get("/metrics").status_code == 200
+
+
+def test_metrics_count_the_queries_of_a_route(
+    client, brand_id, superuser_headers
+):
+    client.get(f"/api/{brand_id}/products")
+
+    response = client.get("/metrics", headers=superuser_headers)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith(
+        "text/plain; version=0.0.4")
+    route = 'method="GET",route="/api/{brand_id}/products"'
+    assert f"http_request_db_queries_count{{{route}}}" in response.text
+    assert "# TYPE http_request_duration_seconds histogram" in response.text
+
+
+def test_slow_queries_are_logged_cut(caplog, monkeypatch):
+    monkeypatch.setattr(metrics.settings, "DB_SLOW_QUERY_THRESHOLD", 1)
+    statement = "SELECT " + "x" * (metrics.SLOW_QUERY_LOG_SIZE * 2)
+
+    with caplog.at_level(logging.WARNING, logger=metrics.__name__):
+        metrics.observe_query("fetch_all", 0.5, 1, statement)
+
+    message = caplog.records[-1].getMessage()
+    assert message.startswith("slow query (500.0 ms, 1 rows, - -): SELECT")
+    assert message.endswith("x...")
+    assert len(message) < metrics.SLOW_QUERY_LOG_SIZE + 100
+
+
+def test_pool_metrics(client, brand_id, superuser_headers):
+    client.get(f"/api/{brand_id}/products")
+
+    response = client.get("/metrics/pool", headers=superuser_headers)
+
+    assert response.status_code == 200
+    stats = response.json()
+    assert stats["acquires"] > 0
+    assert stats["waiting"] == 0
+    assert "replica" not in stats
+
+
+def test_cache_metrics_count_the_user_cache(client, headers, monkeypatch):
+    # scraped anonymously, so the scrape looks up no user
+    monkeypatch.setattr(metrics.settings, "METRICS_PUBLIC", True)
+
+    def user_cache_lookups():
+        lines = client.get("/metrics").text.splitlines()
+        return [
+            sum(
+                float(line.split()[-1]) for line in lines
+                if line.startswith(f'{name}{{cache="user"}}')
+            )
+            for name in ("cache_hits_total", "cache_misses_total")
+        ]
+
+    user_cache.clear()
+    hits, misses = user_cache_lookups()
+    client.get("/api/brands", headers=headers)
+    client.get("/api/brands", headers=headers)
+
+    assert user_cache_lookups() == [hits + 1, misses + 1]
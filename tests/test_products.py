@@ -0,0 +1,98 @@
+"""Tests of the products of a brand."""
+import pytest
+
+from app.crud import product as crud_product
+
+
+def create_product(client, headers, brand_id, **data):
+    return client.post(
+        f"/api/{brand_id}/products",
+        data={"title": "product", "discount_rate": "0.2", **data},
+        headers=headers,
+    )
+
+
+def test_create_update_delete_product(client, headers, brand_id, scalar):
+    response = create_product(client, headers, brand_id)
+    assert response.status_code == 201, response.text
+    assert create_product(client, headers, brand_id).status_code == 409
+
+    response = client.patch(
+        f"/api/{brand_id}/products",
+        params={"title": "product"},
+        json={"discount_rate": 0.7},
+        headers=headers,
+    )
+    assert response.status_code == 200, response.text
+    assert response.json()["discount_rate"] == 0.7
+    assert scalar(
+        "SELECT max_discount_rate FROM brand WHERE id = :brand",
+        brand=brand_id) == 0.7
+
+    response = client.delete(
+        f"/api/{brand_id}/products",
+        params={"title": "product"},
+        headers=headers,
+    )
+    assert response.status_code == 200, response.text
+    assert scalar(
+        "SELECT product_count FROM brand WHERE id = :brand",
+        brand=brand_id) == 0
+
+
+def test_get_products_pages(client, brand_id, import_products):
+    import_products(brand_id, [
+        {"title": f"page-{i}", "discount_rate": 0.1} for i in range(3)])
+
+    first = client.get(
+        f"/api/{brand_id}/products",
+        params={"limit": 2, "fields": "id,title"},
+    ).json()
+    second = client.get(
+        f"/api/{brand_id}/products",
+        params={"limit": 2, "cursor": first["next_cursor"]},
+    ).json()
+
+    assert [item["title"] for item in first["items"]] == ["page-2", "page-1"]
+    assert set(first["items"][0]) == {"id", "title"}
+    assert [item["title"] for item in second["items"]] == ["page-0"]
+    assert second["next_cursor"] is None
+
+
+def test_create_product_rolls_back_on_error(
+    client, headers, brand_id, scalar, monkeypatch
+):
+    async def fail(*args, **kwargs):
+        raise RuntimeError("summary failed")
+
+    monkeypatch.setattr(crud_product, "_update_summary", fail)
+
+    with pytest.raises(RuntimeError):
+        create_product(client, headers, brand_id)
+
+    assert scalar(
+        "SELECT count(*) FROM product WHERE brand = :brand",
+        brand=brand_id) == 0
+
+
+def test_create_product_requires_own_brand(client, login, brand_id):
+    response = create_product(client, login(), brand_id)
+
+    assert response.status_code == 404
+
+
+def test_cached_products_check_the_brand_access(
+    client, create_brand, import_products, scalar
+):
+    brand_id = create_brand()
+    import_products(brand_id, [{"title": "cached", "discount_rate": 0.2}])
+    for _ in range(2):
+        assert client.get(f"/api/{brand_id}/products").status_code == 200
+    # deactivated without invalidating the cache
+    scalar(
+        "UPDATE brand SET is_active = false WHERE id = :id RETURNING id",
+        id=brand_id)
+
+    response = client.get(f"/api/{brand_id}/products")
+
+    assert response.status_code == 403
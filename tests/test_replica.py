@@ -0,0 +1,81 @@
+"""Tests of the read replica routing."""
+import pytest
+import sqlalchemy
+from sqlalchemy.engine import make_url
+
+from app.db.pool import PooledDatabase
+from app.db.session import database, metadata
+
+
+@pytest.fixture
+def replica(client, engine, headers):
+    """
+    Route the reads to a replica that lags behind the primary.
+
+    The replica is an empty copy of the schema with only the users.
+    """
+    url = make_url(str(engine.url))
+    replica_url = url.set(database=f"{url.database}_replica")
+    with engine.connect().execution_options(
+        isolation_level="AUTOCOMMIT"
+    ) as connection:
+        if not connection.execute(sqlalchemy.text(
+            "SELECT 1 FROM pg_database WHERE datname = :name"
+        ), {"name": replica_url.database}).scalar():
+            connection.execute(sqlalchemy.text(
+                f'CREATE DATABASE "{replica_url.database}"'))
+    replica_engine = sqlalchemy.create_engine(replica_url)
+    users = metadata.tables["user"]
+    metadata.drop_all(replica_engine)
+    metadata.create_all(replica_engine)
+    with engine.connect() as source, replica_engine.begin() as target:
+        target.execute(
+            users.insert(),
+            [dict(row) for row in source.execute(users.select()).mappings()])
+    replica_engine.dispose()
+
+    database.replica = PooledDatabase(
+        str(replica_url),
+        min_size=1,
+        max_size=2,
+        acquire_timeout=10,
+        statement_timeout=0,
+        connection_lifetime=300,
+    )
+    client.portal.call(database.replica.connect)
+    yield
+    client.portal.call(database.replica.disconnect)
+    database.replica = None
+
+
+def test_reads_go_to_the_replica(client, headers, brand_id, replica):
+    response = client.get(f"/api/brands/{brand_id}")
+
+    assert response.status_code == 404
+
+
+def test_writes_see_the_primary(client, headers, brand_id, replica, scalar):
+    response = client.post(
+        f"/api/{brand_id}/products",
+        data={"title": "fresh", "discount_rate": "0.1"},
+        headers=headers,
+    )
+    assert response.status_code == 201, response.text
+
+    response = client.patch(
+        f"/api/{brand_id}/products",
+        params={"title": "fresh"},
+        json={"discount_rate": 0.2},
+        headers=headers,
+    )
+    assert response.status_code == 200, response.text
+
+    response = client.patch(
+        f"/api/brands/{brand_id}",
+        json={"about": "fresh"},
+        headers=headers,
+    )
+    assert response.status_code == 200, response.text
+    assert scalar(
+        "SELECT product_count FROM brand WHERE id = :brand",
+        brand=brand_id) == 1
@@ -0,0 +1,48 @@
+"""Tests of the product search."""
+
+
+def test_search_ranks_and_pages(client, brand_id, import_products):
+    import_products(brand_id, [
+        {"title": "linen shirt", "discount_rate": 0.1},
+        {"title": "wool coat", "discount_rate": 0.1,
+         "description": "goes with a linen shirt"},
+        {"title": "leather boots", "discount_rate": 0.1},
+    ])
+
+    response = client.get(
+        "/api/products/search",
+        params={"q": "linen", "brand_id": brand_id, "limit": 1},
+    )
+    assert response.status_code == 200, response.text
+    first = response.json()
+    response = client.get(
+        "/api/products/search",
+        params={
+            "q": "linen", "brand_id": brand_id, "limit": 1,
+            "cursor": first["next_cursor"],
+        },
+    )
+    assert response.status_code == 200, response.text
+    second = response.json()
+
+    assert [item["title"] for item in first["items"]] == ["linen shirt"]
+    assert [item["title"] for item in second["items"]] == ["wool coat"]
+    assert second["next_cursor"] is None
+    assert first["items"][0]["rank"] > second["items"][0]["rank"]
+
+
+def test_search_hides_inactive_brands(
+    client, headers, brand_id, import_products
+):
+    import_products(brand_id, [{"title": "hidden scarf", "discount_rate": 0}])
+    response = client.patch(
+        f"/api/brands/{brand_id}", json={"is_active": False}, headers=headers)
+    assert response.status_code == 200, response.text
+
+    response = client.get("/api/products/search", params={"q": "hidden"})
+    assert response.status_code == 200, response.text
+    assert response.json()["items"] == []
+
+    response = client.get(
+        "/api/products/search", params={"q": "hidden", "brand_id": brand_id})
+    assert response.status_code == 403
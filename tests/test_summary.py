@@ -0,0 +1,99 @@
+"""Tests of the product summary of the brands."""
+import pytest
+import sqlalchemy
+
+from app.crud import product as crud_product
+
+# the backfill of the summary columns (migration 8c2d6f1a9e47)
+BACKFILL = """
+SELECT count(*) AS product_count, max(discount_rate) AS max_discount_rate
+FROM product WHERE brand = :brand
+"""
+
+
+def assert_summary(engine, brand_id):
+    with engine.connect() as connection:
+        expected = connection.execute(
+            sqlalchemy.text(BACKFILL), {"brand": brand_id}).one()
+        actual = connection.execute(sqlalchemy.text(
+            "SELECT product_count, max_discount_rate, products_updated_time "
+            "FROM brand WHERE id = :brand"), {"brand": brand_id}).one()
+    assert actual.product_count == expected.product_count
+    assert actual.max_discount_rate == expected.max_discount_rate
+    assert actual.products_updated_time is not None
+
+
+def test_summary_follows_every_write(
+    client, headers, engine, brand_id, import_products
+):
+    report = import_products(brand_id, [
+        {"title": f"summary-{i}", "discount_rate": i / 10} for i in range(4)])
+    assert_summary(engine, brand_id)
+    ids = [result["id"] for result in report["results"]]
+
+    response = client.patch(
+        f"/api/{brand_id}/products/bulk",
+        json={"ids": ids[:2], "changes": {"discount_rate": 0.8}},
+        headers=headers,
+    )
+    assert response.status_code == 200, response.text
+    assert_summary(engine, brand_id)
+
+    response = client.delete(
+        f"/api/{brand_id}/products/bulk",
+        json={"titles": ["summary-0", "summary-1"]},
+        headers=headers,
+    )
+    assert response.status_code == 200, response.text
+    assert_summary(engine, brand_id)
+
+    response = client.post(
+        f"/api/{brand_id}/products",
+        data={"title": "single", "discount_rate": "0.9"},
+        headers=headers,
+    )
+    assert response.status_code == 201, response.text
+    assert_summary(engine, brand_id)
+
+    response = client.patch(
+        f"/api/{brand_id}/products",
+        params={"title": "single"},
+        json={"discount_rate": 0.1},
+        headers=headers,
+    )
+    assert response.status_code == 200, response.text
+    assert_summary(engine, brand_id)
+
+    response = client.delete(
+        f"/api/{brand_id}/products",
+        params={"title": "single"},
+        headers=headers,
+    )
+    assert response.status_code == 200, response.text
+    assert_summary(engine, brand_id)
+
+    response = client.get(f"/api/brands/{brand_id}/summary", headers=headers)
+    assert response.status_code == 200, response.text
+    assert response.json()["product_count"] == 2
+
+
+def test_summary_rolls_back_with_the_write(
+    client, headers, engine, brand_id, import_products, monkeypatch
+):
+    import_products(brand_id, [{"title": "kept", "discount_rate": 0.3}])
+    update_summary = crud_product._update_summary
+
+    async def update_then_fail(*args, **kwargs):
+        await update_summary(*args, **kwargs)
+        raise RuntimeError("write failed")
+
+    monkeypatch.setattr(crud_product, "_update_summary", update_then_fail)
+
+    with pytest.raises(RuntimeError):
+        client.delete(
+            f"/api/{brand_id}/products",
+            params={"title": "kept"},
+            headers=headers,
+        )
+
+    assert_summary(engine, brand_id)
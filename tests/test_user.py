@@ -0,0 +1,39 @@
+"""Tests of the users."""
+from uuid import uuid4
+
+import pytest
+
+from app import exceptions as exc
+from app.crud.user import CRUDUser
+from app.deps import get_user_from_token
+
+
+@pytest.fixture
+def token(client):
+    email = f"{uuid4().hex}@example.com"
+    response = client.post("/api/users", json={
+        "email": email, "password": "secret1", "name": "before"})
+    assert response.status_code == 201, response.text
+    response = client.post("/api/auth/access-token", data={
+        "username": email, "password": "secret1"})
+    assert response.status_code == 200, response.text
+    return response.json()["access_token"]
+
+
+def test_token_lookup_sees_user_update(client, token):
+    async def update():
+        user = await get_user_from_token(token)
+        await CRUDUser.update(user_obj=user, obj_in={"name": "after"})
+        return await get_user_from_token(token)
+
+    assert client.portal.call(update).name == "after"
+
+
+def test_token_lookup_sees_user_removal(client, token):
+    async def remove():
+        user = await get_user_from_token(token)
+        await CRUDUser.remove(user_obj=user)
+        return await get_user_from_token(token)
+
+    with pytest.raises(exc.NotFoundError):
+        client.portal.call(remove)